@@ -5,13 +5,38 @@ Loads and validates configuration from YAML file with environment variable subst
 Provides typed access to all configuration settings.
 """
 
+import contextlib
+import functools
+import hashlib
+import json
+import mmap
 import os
 import re
+import tempfile
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any
 
 import yaml
 
+# Prefer the libyaml C backend; fall back to the pure-Python loader
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+# Parsed YAML documents keyed by (resolved path, st_mtime_ns, st_size).
+# Entries hold the raw (pre-substitution) tree, frozen so it can be shared
+# without copying, plus the key paths of its ${VAR} references.
+_YAML_CACHE: dict[tuple[str, int, int], tuple[Mapping, tuple[tuple[Any, ...], ...]]] = {}
+_YAML_CACHE_LOCK = threading.Lock()
+
+# Matches ${VAR_NAME} references in string values
+_ENV_RE = re.compile(r"\$\{([^}]+)\}")
+
 
 class ConfigError(Exception):
     """Raised when configuration is invalid or missing required fields."""
@@ -19,6 +44,255 @@ class ConfigError(Exception):
     pass
 
 
+@dataclass(frozen=True, slots=True)
+class _Settings:
+    """Precomputed settings, so property access is a plain attribute read."""
+
+    vault_path: Path
+    chromadb_path: Path
+    openai_api_key: str
+    target_chunk_size: int
+    max_chunk_size: int
+    min_chunk_size: int
+    embedding_model: str
+    embedding_batch_size: int
+    default_n_results: int
+    similarity_threshold: float
+    debounce_seconds: float
+
+
+def _merge_defaults(defaults: Mapping, config: Mapping) -> dict:
+    """
+    Deep-merge a parsed config over a table of defaults.
+
+    Values from the config win; nested mappings are merged key by key.
+
+    Args:
+        defaults: Default values
+        config: Parsed config
+
+    Returns:
+        New dict holding the merged tree (config subtrees are reused)
+    """
+    merged = dict(defaults)
+    for key, value in config.items():
+        default = merged.get(key)
+        if isinstance(default, Mapping) and isinstance(value, Mapping):
+            merged[key] = _merge_defaults(default, value)
+        else:
+            merged[key] = value
+
+    return merged
+
+
+def _find_env_refs(raw_config: dict) -> tuple[tuple[Any, ...], ...]:
+    """
+    Collect the key paths of string values that contain ${VAR} references.
+
+    Runs once per parse; the result is cached next to the raw tree so each
+    load substitutes only these leaves instead of walking the document.
+
+    Args:
+        raw_config: Raw (pre-substitution) config dict
+
+    Returns:
+        Tuple of key paths, e.g. (("sources", 0, "path"),)
+    """
+    refs: list[tuple[Any, ...]] = []
+    stack: list[tuple[tuple[Any, ...], Any]] = [((), raw_config)]
+    while stack:
+        prefix, node = stack.pop()
+        items = node.items() if isinstance(node, dict) else enumerate(node)
+        for key, value in items:
+            if isinstance(value, str):
+                if "${" in value:
+                    refs.append((*prefix, key))
+            elif isinstance(value, (dict, list)):
+                stack.append(((*prefix, key), value))
+
+    return tuple(refs)
+
+
+def _freeze(node: Any) -> Any:
+    """
+    Make a config tree immutable: dicts become MappingProxyType, lists tuples.
+
+    Already-frozen subtrees are returned unchanged.
+
+    Args:
+        node: Config value
+
+    Returns:
+        Frozen equivalent of the value
+    """
+    if isinstance(node, dict):
+        return MappingProxyType({key: _freeze(value) for key, value in node.items()})
+    if isinstance(node, list):
+        return tuple(_freeze(item) for item in node)
+    return node
+
+
+def _thaw(node: Any) -> Any:
+    """
+    Convert a frozen config tree back to plain dicts and lists.
+
+    Args:
+        node: Frozen config value
+
+    Returns:
+        Mutable equivalent of the value
+    """
+    if isinstance(node, Mapping):
+        return {key: _thaw(value) for key, value in node.items()}
+    if isinstance(node, tuple):
+        return [_thaw(item) for item in node]
+    return node
+
+
+def _flatten(config: Mapping) -> dict[str, Any]:
+    """
+    Index a config tree by dotted key path.
+
+    Both leaves and intermediate mappings are recorded, so
+    "chunking" and "chunking.target_chunk_size" each resolve in one lookup.
+
+    Args:
+        config: Substituted (frozen) config
+
+    Returns:
+        Mapping of dotted key paths to values
+    """
+    flat: dict[str, Any] = {}
+    stack: list[tuple[str, Mapping]] = [("", config)]
+    while stack:
+        prefix, node = stack.pop()
+        for key, value in node.items():
+            path = f"{prefix}{key}"
+            flat[path] = value
+            if isinstance(value, Mapping):
+                stack.append((f"{path}.", value))
+
+    return flat
+
+
+def _sidecar_path(resolved_path: str) -> Path:
+    """
+    Get the cross-process parse cache file for a config path.
+
+    Sidecars can hold inline secrets such as openai_api_key, so they live
+    in the per-user cache directory ($XDG_CACHE_HOME or ~/.cache), never in
+    the shared temp directory.
+
+    Args:
+        resolved_path: Absolute path of the config file
+
+    Returns:
+        Path of the JSON sidecar
+    """
+    cache_home = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    digest = hashlib.blake2b(resolved_path.encode("utf-8"), digest_size=8).hexdigest()
+    return Path(cache_home) / "omni-search-engine" / f"config-{digest}.json"
+
+
+def _read_sidecar(sidecar: Path, cache_key: str) -> dict | None:
+    """
+    Read a raw config tree written by a previous process.
+
+    The sidecar is stored as JSON (never pickle) and only trusted when owned
+    by the current user.
+
+    Args:
+        sidecar: Sidecar file path
+        cache_key: Expected digest of the config file bytes
+
+    Returns:
+        Raw (pre-substitution) config dict, or None if missing or stale
+    """
+    try:
+        with open(sidecar, encoding="utf-8") as f:
+            if hasattr(os, "getuid") and os.fstat(f.fileno()).st_uid != os.getuid():
+                return None
+            if f.readline().rstrip("\n") != cache_key:
+                return None
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    return data if isinstance(data, dict) else None
+
+
+def _write_sidecar(sidecar: Path, cache_key: str, raw_config: dict) -> None:
+    """
+    Persist a raw config tree for other processes (best effort).
+
+    Trees that do not survive a JSON round trip unchanged (dates, non-string
+    keys, ...) are not cached. The directory is created owner-only and the
+    file is written 0600.
+
+    Args:
+        sidecar: Sidecar file path
+        cache_key: Digest of the parsed config file bytes
+        raw_config: Raw (pre-substitution) config dict
+    """
+    try:
+        payload = json.dumps(raw_config)
+        if json.loads(payload) != raw_config:
+            return
+    except (TypeError, ValueError):
+        return
+
+    try:
+        sidecar.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        # mkstemp creates the file readable and writable by the owner only
+        fd, temp_path = tempfile.mkstemp(dir=sidecar.parent, suffix=".tmp")
+    except OSError:
+        return
+
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(f"{cache_key}\n{payload}")
+        os.replace(temp_path, sidecar)
+    except OSError:
+        with contextlib.suppress(OSError):
+            os.unlink(temp_path)
+
+
+def _resolve_config_path(config_path: str | None = None) -> tuple[Path, os.stat_result]:
+    """
+    Locate the config file to load.
+
+    Each candidate is probed with a single os.stat, and the result is
+    returned so callers can key caches on it without statting again.
+
+    Args:
+        config_path: Explicit path, or None to use CONFIG_PATH / ./config.yaml /
+                     /data/config.yaml in that order
+
+    Returns:
+        (path, stat_result) tuple for an existing config file
+
+    Raises:
+        ConfigError: If no config file can be found
+    """
+    if config_path is None:
+        config_path = os.getenv("CONFIG_PATH")
+
+    if config_path is not None:
+        try:
+            return Path(config_path), os.stat(config_path)
+        except OSError:
+            raise ConfigError(f"Config file not found: {config_path}") from None
+
+    # Try local first, then container default
+    for candidate in ("./config.yaml", "/data/config.yaml"):
+        try:
+            return Path(candidate), os.stat(candidate)
+        except OSError:
+            continue
+
+    raise ConfigError("Config file not found. Please set CONFIG_PATH or create config.yaml")
+
+
 class Config:
     """
     Configuration manager for Obsidian Semantic Search.
@@ -28,9 +302,34 @@ class Config:
     - Path expansion: ~/ to absolute paths
     - Required field validation
     - Nested configuration access
+
+    The file is located on construction but only parsed and validated on
+    first access, so short-lived processes that never read a setting skip
+    the YAML cost entirely.
     """
 
-    def __init__(self, config_path: str | None = None):
+    # Optional settings, merged under the parsed file once per parse
+    _DEFAULTS: Mapping[str, Any] = {
+        "chromadb_path": "~/.config/obsidian-semantic-search/chromadb",
+        "chunking": {
+            "target_chunk_size": 800,
+            "max_chunk_size": 1500,
+            "min_chunk_size": 100,
+        },
+        "embedding": {
+            "model": "text-embedding-3-small",
+            "batch_size": 100,
+        },
+        "search": {
+            "default_n_results": 5,
+            "similarity_threshold": 0.7,
+        },
+        "watcher": {
+            "debounce_seconds": 30.0,
+        },
+    }
+
+    def __init__(self, config_path: str | None = None, eager: bool = False):
         """
         Initialize configuration from YAML file.
 
@@ -39,162 +338,310 @@ class Config:
                          1. CONFIG_PATH environment variable
                          2. ./config.yaml
                          3. /data/config.yaml (container default)
+            eager: Parse and validate immediately instead of on first access
 
         Raises:
-            ConfigError: If config file not found or invalid
-        """
-        # Determine config path
-        if config_path is None:
-            config_path = os.getenv("CONFIG_PATH")
-        if config_path is None:
-            # Try local first, then container default
-            if Path("./config.yaml").exists():
-                config_path = "./config.yaml"
-            elif Path("/data/config.yaml").exists():
-                config_path = "/data/config.yaml"
-            else:
-                raise ConfigError(
-                    "Config file not found. Please set CONFIG_PATH or create config.yaml"
-                )
+            ConfigError: If config file not found, or (with eager=True) invalid
+        """
+        self.config_path, self._stat = _resolve_config_path(config_path)
+
+        self._config: Mapping = MappingProxyType({})
+        self._flat: dict[str, Any] = {}
+        self._vault_path: Path | None = None
+        self._repr_cache: str | None = None
+        self._loaded = False
 
-        self.config_path = Path(config_path)
-        if not self.config_path.exists():
-            raise ConfigError(f"Config file not found: {self.config_path}")
+        if eager:
+            self._ensure_loaded()
 
-        # Load and parse YAML
-        with open(self.config_path) as f:
-            raw_config = yaml.safe_load(f)
+    def _ensure_loaded(self) -> None:
+        """
+        Parse, substitute and validate the config file on first use.
+
+        Raises:
+            ConfigError: If config is invalid
+        """
+        if self._loaded:
+            return
 
-        if not isinstance(raw_config, dict):
-            raise ConfigError(f"Invalid config file: {self.config_path}")
+        # Load and parse YAML (reusing a cached parse if the file is unchanged)
+        raw_config, env_refs = self._load_yaml()
 
         # Substitute environment variables
-        self._config = self._substitute_env_vars(raw_config)
+        self._config = self._substitute_env_vars(raw_config, env_refs)
 
         # Validate required fields
         self._validate()
 
-    def _substitute_env_vars(self, obj: Any) -> Any:
+        # Index every dotted key path for get()
+        self._flat = _flatten(self._config)
+        self._repr_cache = None
+
+        self._loaded = True
+
+    def _load_yaml(self) -> tuple[Mapping, tuple[tuple[Any, ...], ...]]:
+        """
+        Parse the config file, reusing a previous parse if the file is unchanged.
+
+        Checks the in-process cache first, then the cross-process JSON sidecar,
+        and only then runs the YAML parser.
+
+        Returns:
+            (raw_config, env_refs) tuple: the shared, frozen raw
+            (pre-substitution) config, and the key paths of its ${VAR}
+            references
+
+        Raises:
+            ConfigError: If the file does not contain a YAML mapping
+        """
+        st = self._stat
+        key = (str(self.config_path.resolve()), st.st_mtime_ns, st.st_size)
+
+        with _YAML_CACHE_LOCK:
+            cached = _YAML_CACHE.get(key)
+
+        if cached is None:
+            raw_config, has_refs = self._parse_file(_sidecar_path(key[0]))
+
+            if not isinstance(raw_config, dict):
+                raise ConfigError(f"Invalid config file: {self.config_path}")
+
+            # Without "${" (or an escape that could spell it) in the source,
+            # the parsed tree cannot contain a reference
+            env_refs = _find_env_refs(raw_config) if has_refs else ()
+            cached = (_freeze(_merge_defaults(self._DEFAULTS, raw_config)), env_refs)
+            with _YAML_CACHE_LOCK:
+                _YAML_CACHE[key] = cached
+
+        return cached
+
+    def _parse_file(self, sidecar: Path) -> tuple[Any, bool]:
         """
-        Recursively substitute ${VAR_NAME} with environment variables.
+        Parse the config file straight from a read-only memory map.
+
+        Hands the mapped bytes to the loader so the file is not copied
+        through Python's text I/O layer first. The bytes are hashed first:
+        if another process already parsed identical bytes, its sidecar is
+        used instead of the parser, and otherwise a new sidecar is written.
 
         Args:
-            obj: Configuration object (dict, list, str, or other)
+            sidecar: Sidecar file path for this config file
 
         Returns:
-            Object with environment variables substituted
-        """
-        if isinstance(obj, dict):
-            return {k: self._substitute_env_vars(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self._substitute_env_vars(item) for item in obj]
-        elif isinstance(obj, str):
-            # Find all ${VAR_NAME} patterns
-            pattern = r"\$\{([^}]+)\}"
-            matches = re.findall(pattern, obj)
-
-            for var_name in matches:
-                env_value = os.getenv(var_name)
-                if env_value is None:
-                    raise ConfigError(
-                        f"Environment variable not set: {var_name} (required in config: {obj})"
-                    )
-                obj = obj.replace(f"${{{var_name}}}", env_value)
-
-            return obj
-        else:
-            return obj
+            (document, has_refs) tuple: the parsed YAML document (None for an
+            empty file) and whether the source may contain a "${" reference
+        """
+        with open(self.config_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # mmap cannot map an empty file
+                return None, False
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                cache_key = hashlib.blake2b(mm, digest_size=16).hexdigest()
+                document = _read_sidecar(sidecar, cache_key)
+                if document is not None:
+                    return document, True
+
+                has_refs = mm.find(b"${") != -1 or mm.find(b"\\") != -1
+                document = yaml.load(mm, Loader=_SafeLoader)
+
+        if isinstance(document, dict):
+            _write_sidecar(sidecar, cache_key, document)
+        return document, has_refs
+
+    def _substitute_env_vars(
+        self, config: Mapping, env_refs: tuple[tuple[Any, ...], ...]
+    ) -> Mapping:
+        """
+        Substitute ${VAR_NAME} with environment variables.
+
+        Only the leaves recorded by _find_env_refs are visited. The shared
+        frozen tree is never modified: containers along each reference path
+        are copied, and untouched subtrees are reused as-is.
+
+        Args:
+            config: Frozen raw configuration
+            env_refs: Key paths of string values containing references
+
+        Returns:
+            Frozen configuration with environment variables substituted
+        """
+        if not env_refs:
+            return config
+
+        root: Any = dict(config)
+        for ref in env_refs:
+            node = root
+            for key in ref[:-1]:
+                child = node[key]
+                if isinstance(child, MappingProxyType):
+                    child = node[key] = dict(child)
+                elif isinstance(child, tuple):
+                    child = node[key] = list(child)
+                node = child
+            node[ref[-1]] = self._substitute_string(node[ref[-1]])
+
+        return _freeze(root)
+
+    def _substitute_string(self, value: str) -> str:
+        """
+        Substitute ${VAR_NAME} references within a single string.
+
+        Args:
+            value: Config string containing at least one reference
+
+        Returns:
+            String with references replaced by environment values
+        """
+        # Common case: the whole value is one reference (api_key: ${OPENAI_API_KEY}).
+        # Return the env value itself rather than building a new string via sub().
+        match = _ENV_RE.fullmatch(value)
+        if match is not None:
+            return self._env_repl(match, value)
+        return _ENV_RE.sub(lambda match: self._env_repl(match, value), value)
+
+    @staticmethod
+    def _env_repl(match: re.Match, value: str) -> str:
+        """
+        Resolve a single ${VAR_NAME} match from the environment.
+
+        Args:
+            match: Regex match for the reference
+            value: Full config string (for error reporting)
+
+        Returns:
+            Environment variable value
+
+        Raises:
+            ConfigError: If the environment variable is not set
+        """
+        var_name = match.group(1)
+        env_value = os.environ.get(var_name)
+        if env_value is None:
+            raise ConfigError(
+                f"Environment variable not set: {var_name} (required in config: {value})"
+            )
+        return env_value
 
     def _validate(self):
-        """Validate required configuration fields."""
-        required_fields = [
-            ("obsidian_vault_path", str),
-            ("openai_api_key", str),
-        ]
-
-        for field_name, field_type in required_fields:
-            if field_name not in self._config:
-                raise ConfigError(f"Missing required field: {field_name}")
-
-            value = self._config[field_name]
-            if not isinstance(value, field_type):
-                raise ConfigError(
-                    f"Invalid type for {field_name}: "
-                    f"expected {field_type.__name__}, got {type(value).__name__}"
-                )
+        """
+        Validate required configuration fields.
+
+        Also resolves the vault path once, so vault_path never re-stats it.
+        """
+        cfg = self._config
+
+        if "obsidian_vault_path" not in cfg:
+            raise ConfigError("Missing required field: obsidian_vault_path")
+        value = cfg["obsidian_vault_path"]
+        if not isinstance(value, str):
+            raise ConfigError(
+                f"Invalid type for obsidian_vault_path: expected str, got {type(value).__name__}"
+            )
+        vault_path = Path(value).expanduser().resolve()
+        if not vault_path.exists():
+            raise ConfigError(f"Obsidian vault not found: {value} (expanded: {vault_path})")
+        self._vault_path = vault_path
+
+        if "openai_api_key" not in cfg:
+            raise ConfigError("Missing required field: openai_api_key")
+        value = cfg["openai_api_key"]
+        if not isinstance(value, str):
+            raise ConfigError(
+                f"Invalid type for openai_api_key: expected str, got {type(value).__name__}"
+            )
+        if not value.startswith("sk-"):
+            raise ConfigError("Invalid OpenAI API key format: should start with 'sk-'")
+
+    @functools.cached_property
+    def _settings(self) -> _Settings:
+        """
+        Resolve settings and paths once, on first access.
 
-            # Additional validation for paths and keys
-            if field_name == "obsidian_vault_path":
-                vault_path = Path(value).expanduser()
-                if not vault_path.exists():
-                    raise ConfigError(f"Obsidian vault not found: {value} (expanded: {vault_path})")
+        Returns:
+            Immutable snapshot of defaults merged with the loaded config
+        """
+        self._ensure_loaded()
+        cfg = self._config
+        chunking = cfg["chunking"]
+        embedding = cfg["embedding"]
+        search = cfg["search"]
+
+        debounce_seconds = cfg["watcher"]["debounce_seconds"]
+        env_val = os.getenv("DEBOUNCE_SECONDS")
+        if env_val:
+            try:
+                debounce_seconds = float(env_val)
+            except ValueError:
+                pass
 
-            if field_name == "openai_api_key":
-                if not value.startswith("sk-"):
-                    raise ConfigError("Invalid OpenAI API key format: should start with 'sk-'")
+        return _Settings(
+            vault_path=self._vault_path,
+            chromadb_path=Path(cfg["chromadb_path"]).expanduser().resolve(),
+            openai_api_key=cfg["openai_api_key"],
+            target_chunk_size=chunking["target_chunk_size"],
+            max_chunk_size=chunking["max_chunk_size"],
+            min_chunk_size=chunking["min_chunk_size"],
+            embedding_model=embedding["model"],
+            embedding_batch_size=embedding["batch_size"],
+            default_n_results=search["default_n_results"],
+            similarity_threshold=search["similarity_threshold"],
+            debounce_seconds=debounce_seconds,
+        )
 
     @property
     def vault_path(self) -> Path:
         """Get Obsidian vault path (expanded and absolute)."""
-        return Path(self._config["obsidian_vault_path"]).expanduser().resolve()
+        return self._settings.vault_path
 
     @property
     def openai_api_key(self) -> str:
         """Get OpenAI API key."""
-        return self._config["openai_api_key"]
+        return self._settings.openai_api_key
 
     @property
     def chromadb_path(self) -> Path:
         """Get ChromaDB storage path (expanded and absolute)."""
-        default_path = "~/.config/obsidian-semantic-search/chromadb"
-        path_str = self._config.get("chromadb_path", default_path)
-        return Path(path_str).expanduser().resolve()
+        return self._settings.chromadb_path
 
     @property
     def target_chunk_size(self) -> int:
         """Get target chunk size in tokens."""
-        return self._config.get("chunking", {}).get("target_chunk_size", 800)
+        return self._settings.target_chunk_size
 
     @property
     def max_chunk_size(self) -> int:
         """Get maximum chunk size in tokens."""
-        return self._config.get("chunking", {}).get("max_chunk_size", 1500)
+        return self._settings.max_chunk_size
 
     @property
     def min_chunk_size(self) -> int:
         """Get minimum chunk size in tokens."""
-        return self._config.get("chunking", {}).get("min_chunk_size", 100)
+        return self._settings.min_chunk_size
 
     @property
     def embedding_model(self) -> str:
         """Get OpenAI embedding model name."""
-        return self._config.get("embedding", {}).get("model", "text-embedding-3-small")
+        return self._settings.embedding_model
 
     @property
     def embedding_batch_size(self) -> int:
         """Get embedding batch size for API calls."""
-        return self._config.get("embedding", {}).get("batch_size", 100)
+        return self._settings.embedding_batch_size
 
     @property
     def default_n_results(self) -> int:
         """Get default number of search results to return."""
-        return self._config.get("search", {}).get("default_n_results", 5)
+        return self._settings.default_n_results
 
     @property
     def similarity_threshold(self) -> float:
         """Get similarity threshold for link suggestions."""
-        return self._config.get("search", {}).get("similarity_threshold", 0.7)
+        return self._settings.similarity_threshold
 
     @property
     def debounce_seconds(self) -> float:
         """Get debounce seconds for file watcher."""
-        env_val = os.getenv("DEBOUNCE_SECONDS")
-        if env_val:
-            try:
-                return float(env_val)
-            except ValueError:
-                pass
-        return self._config.get("watcher", {}).get("debounce_seconds", 30.0)
+        return self._settings.debounce_seconds
 
     def get(self, key: str, default: Any = None) -> Any:
         """
@@ -207,31 +654,39 @@ class Config:
         Returns:
             Configuration value or default
         """
-        keys = key.split(".")
-        value = self._config
+        self._ensure_loaded()
+        return self._flat.get(key, default)
+
+    def __repr__(self) -> str:
+        """String representation of config (masks API key, built once)."""
+        if self._repr_cache is None:
+            self._ensure_loaded()
+            masked_config = _thaw(self._config)
+            if "openai_api_key" in masked_config:
+                key = masked_config["openai_api_key"]
+                masked_config["openai_api_key"] = (
+                    f"{key[:7]}...{key[-4:]}" if len(key) > 11 else "***"
+                )
 
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
+            self._repr_cache = f"Config(path={self.config_path}, settings={masked_config})"
 
-        return value
+        return self._repr_cache
 
-    def __repr__(self) -> str:
-        """String representation of config (masks API key)."""
-        masked_config = self._config.copy()
-        if "openai_api_key" in masked_config:
-            key = masked_config["openai_api_key"]
-            masked_config["openai_api_key"] = f"{key[:7]}...{key[-4:]}" if len(key) > 11 else "***"
 
-        return f"Config(path={self.config_path}, settings={masked_config})"
+@functools.lru_cache(maxsize=32)
+def _cached_load(path: str, mtime_ns: int, size: int) -> Config:
+    """Build one Config per resolved config path and file version."""
+    return Config(path)
 
 
 def load_config(config_path: str | None = None) -> Config:
     """
     Load configuration from file.
 
+    Instances are memoized per resolved path and file (mtime, size), so
+    repeated calls from different modules share one Config until the file
+    changes. Use load_config.cache_clear() to force a reload (e.g. in tests).
+
     Args:
         config_path: Optional path to config file
 
@@ -241,4 +696,8 @@ def load_config(config_path: str | None = None) -> Config:
     Raises:
         ConfigError: If config is invalid
     """
-    return Config(config_path)
+    path, st = _resolve_config_path(config_path)
+    return _cached_load(str(path.resolve()), st.st_mtime_ns, st.st_size)
+
+
+load_config.cache_clear = _cached_load.cache_clear
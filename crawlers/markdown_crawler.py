@@ -5,14 +5,153 @@ Splits markdown documents into semantic chunks based on header structure.
 Preserves header hierarchy as context and respects token size constraints.
 """
 
+import multiprocessing
 import re
-from dataclasses import dataclass, field
+import sys
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import chain
 from pathlib import Path
 
-from utils import count_tokens, remove_frontmatter
+from utils import (
+    count_tokens,
+    count_tokens_batch,
+    decode_tokens,
+    encode_text,
+    max_token_length,
+    remove_frontmatter,
+)
 
+# Blank line (possibly containing whitespace) separating paragraphs
+_PARA_RE = re.compile(r"\n\s*\n")
+# Sentence end: . ! or ? followed by whitespace (group 1 is the whitespace)
+_SENT_END_RE = re.compile(r"[.!?](\s+)")
+# Code fence or table row as the first non-whitespace text of a paragraph
+_PROTECTED_START_RE = re.compile(r"\s*(?:```|\|)")
 
-@dataclass
+
+def _normalize_newlines(content: str) -> str:
+    """Convert CRLF and lone CR line endings to LF."""
+    if "\r" not in content:
+        return content
+    return content.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _line_start_hashes(content: str) -> Iterator[int]:
+    """
+    Yield the index of every '#' that begins a line (candidate headers).
+
+    Jumps between "\\n#" occurrences with str.find, so '#' used mid-line
+    (inline tags, issue numbers) is never inspected.
+
+    Args:
+        content: Markdown content with LF line endings
+
+    Yields:
+        Indexes of line-initial '#' characters, in order
+    """
+    if content.startswith("#"):
+        yield 0
+
+    pos = content.find("\n#")
+    while pos != -1:
+        yield pos + 1
+        pos = content.find("\n#", pos + 2)
+
+
+def _header_level(line: str) -> int:
+    """
+    Return the level of a markdown header line, or 0 for any other line.
+
+    A header is 1-6 '#' followed by whitespace and a non-empty remainder.
+
+    Args:
+        line: Single line without its line break
+
+    Returns:
+        Header level (1-6), or 0 if the line is not a header
+    """
+    n = len(line)
+    level = 0
+    while level < 6 and level < n and line[level] == "#":
+        level += 1
+    if level and level + 1 < n and line[level].isspace():
+        return level
+    return 0
+
+
+def _scan_fenced_blocks(content: str) -> Iterator[tuple[str, str]]:
+    """
+    Split content into (text_before, fenced_block) pairs in one linear pass.
+
+    A fence is a run of 3+ backticks closed by the next run of the same
+    length, so 4+ tick fences can wrap 3 tick ones. Like the backreference
+    regex this replaces, an opening run with no matching close falls back
+    to shorter delimiters before being left in the surrounding text.
+
+    Args:
+        content: Markdown content
+
+    Yields:
+        (text, block) tuples; the last one carries the trailing text and
+        an empty block
+    """
+    # Scans the str directly: str.find is a fast search for every string
+    # width, while round-tripping through UTF-8 bytes costs an encode plus a
+    # decode per emitted slice and measured slower on non-ASCII notes
+    length = len(content)
+    text_start = pos = 0
+    # Shortest fence already known to have no closing run further on
+    unclosed = length + 1
+
+    while (start := content.find("```", pos)) != -1:
+        end = start + 3
+        while end < length and content[end] == "`":
+            end += 1
+
+        close = -1
+        for size in range(min(end - start, unclosed - 1), 2, -1):
+            close = content.find("`" * size, start + size)
+            if close != -1:
+                break
+            unclosed = size
+
+        if close == -1:
+            pos = end
+            continue
+
+        pos = close + size
+        yield content[text_start:start], content[start:pos]
+        text_start = pos
+
+    yield content[text_start:], ""
+
+
+def _split_sentences(text: str) -> list[str]:
+    """
+    Split text after each sentence-ending . ! or ? that precedes whitespace.
+
+    Equivalent to re.split(r"(?<=[.!?])\\s+", text), but matches on the
+    punctuation itself so the regex engine can skip ahead to candidate
+    characters instead of evaluating a lookbehind at every whitespace run.
+
+    Args:
+        text: Paragraph text
+
+    Returns:
+        List of sentences with the separating whitespace removed
+    """
+    sentences = []
+    start = 0
+    for match in _SENT_END_RE.finditer(text):
+        sentences.append(text[start : match.start(1)])
+        start = match.end()
+    sentences.append(text[start:])
+    return sentences
+
+
+@dataclass(slots=True)
 class Chunk:
     """
     Represents a semantic chunk of markdown content.
@@ -25,7 +164,7 @@ class Chunk:
         file_path: Relative path from vault root (set by indexer)
         note_title: Note filename without extension (set by indexer)
         folder: Parent folder path (set by indexer)
-        tags: List of tags from note (set by indexer)
+        tags: Tags from note, read-only (set by indexer)
         parent_id: Unique ID of the parent document (set by indexer)
     """
 
@@ -36,7 +175,7 @@ class Chunk:
     file_path: str = ""
     note_title: str = ""
     folder: str = ""
-    tags: list[str] = field(default_factory=list)
+    tags: tuple[str, ...] = ()
     parent_id: str = ""
 
 
@@ -89,100 +228,151 @@ class MarkdownChunker:
         # Remove frontmatter (already extracted separately)
         content_no_frontmatter = remove_frontmatter(content)
 
-        # Split into sections by headers
-        sections = self._split_by_headers(content_no_frontmatter)
+        # Fast path: a note without header lines that fits the target is one chunk
+        fast_chunk = self._single_chunk(content_no_frontmatter.strip())
+        if fast_chunk is not None:
+            return [fast_chunk]
 
-        # Process sections into chunks
+        # Split into sections by headers, processing each as soon as it is found
         chunks = []
-        for section in sections:
-            section_chunks = self._process_section(section)
-            chunks.extend(section_chunks)
+        for section in self._split_by_headers(content_no_frontmatter):
+            chunks.extend(self._process_section(section))
 
-        # Merge small chunks if possible
-        chunks = self._merge_small_chunks(chunks)
+        # Merge small chunks if possible (also assigns final chunk indices)
+        return self._merge_small_chunks(chunks)
 
-        # Assign chunk indices
-        for i, chunk in enumerate(chunks):
-            chunk.chunk_index = i
+    def chunk_markdown_many(
+        self, contents: list[str], max_workers: int | None = None
+    ) -> list[list[Chunk]]:
+        """
+        Split many markdown documents into chunks in parallel worker processes.
 
-        return chunks
+        This is the one place chunking fans out to a process pool;
+        chunk_markdown_files reads files and delegates here. Workers are
+        spawned rather than forked, so they never inherit locks held by the
+        server's or watcher's threads.
 
-    def _split_by_headers(self, content: str) -> list[tuple[str, str]]:
-        """
-        Split content by markdown headers, preserving hierarchy.
+        Args:
+            contents: Markdown documents to chunk
+            max_workers: Worker processes (defaults to the CPU count)
 
         Returns:
-            List of (header_context, content) tuples
+            Chunks for each document, in input order
         """
-        # Pattern to match markdown headers
-        header_pattern = r"^(#{1,6})\s+(.+)$"
+        # A pool only pays for itself with more than one document to spread out
+        if len(contents) < 2 or max_workers == 1:
+            return [self.chunk_markdown(content) for content in contents]
 
-        lines = content.split("\n")
-        sections = []
-        current_section_lines = []
-        header_stack = []  # Track hierarchy: [(level, title), ...]
-        has_headers = False
+        with ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            return list(executor.map(self.chunk_markdown, contents, chunksize=8))
 
-        for line in lines:
-            header_match = re.match(header_pattern, line)
+    def _single_chunk(self, content: str) -> Chunk | None:
+        """
+        Return content as one chunk when splitting could not change it.
 
-            if header_match:
-                has_headers = True
-                # Save previous section if it has content
-                if current_section_lines:
-                    header_context = self._build_header_context(header_stack)
-                    section_content = "\n".join(current_section_lines).strip()
-                    if section_content:
-                        sections.append((header_context, section_content))
-                    current_section_lines = []
+        Without header lines the whole note is a single section, and a
+        section within the target size is emitted as-is, so the split and
+        merge passes can be skipped.
 
-                # Update header stack
-                level = len(header_match.group(1))  # Number of # symbols
-                title = header_match.group(2).strip()
+        Args:
+            content: Stripped markdown content without frontmatter
 
-                # Pop headers at same or higher level
-                while header_stack and header_stack[-1][0] >= level:
-                    header_stack.pop()
+        Returns:
+            The single chunk, or None if the full pipeline is needed
+        """
+        if not content or content.startswith("#") or "\n#" in content or "\r#" in content:
+            return None
+        if self._exceeds_target(content):
+            return None
 
-                # Add new header
-                header_stack.append((level, title))
+        token_count = count_tokens(content, self.model)
+        if token_count > self.target_chunk_size:
+            return None
 
-            else:
-                # Regular content line
-                current_section_lines.append(line)
+        return Chunk(
+            content=content,
+            chunk_index=0,
+            header_context="",
+            token_count=token_count,
+        )
 
-        # Add final section
-        if current_section_lines:
-            header_context = self._build_header_context(header_stack)
-            section_content = "\n".join(current_section_lines).strip()
-            if section_content:
-                sections.append((header_context, section_content))
+    def _exceeds_target(self, content: str) -> bool:
+        """
+        Cheap check for text too long to fit the target, without counting it.
 
-        # If no headers found at all, treat entire content as one section
-        if not has_headers and content.strip():
-            return [("", content.strip())]
+        No token spans more than max_token_length characters, so text longer
+        than that many times the target cannot fit.
 
-        return sections
+        Args:
+            content: Text to check
 
-    def _build_header_context(self, header_stack: list[tuple[int, str]]) -> str:
+        Returns:
+            True if the text is certainly over target_chunk_size tokens
         """
-        Build full header hierarchy string from stack.
+        return len(content) > self.target_chunk_size * max_token_length(self.model)
 
-        Args:
-            header_stack: List of (level, title) tuples
+    def _split_by_headers(self, content: str) -> Iterator[tuple[str, str]]:
+        """
+        Split content by markdown headers, preserving hierarchy.
 
-        Returns:
-            Header context string (e.g., "## Markets / ### Gold")
+        Line endings are normalized to LF first, then only lines starting
+        with '#' are inspected; the text between headers is sliced out whole
+        rather than collected line by line. The header context string is
+        rebuilt only when a header changes the hierarchy, and shared by every
+        section until the next one.
+
+        Yields:
+            (header_context, content) tuples as each section is completed
         """
-        if not header_stack:
-            return ""
+        text = _normalize_newlines(content)
+        header_stack = []  # Track hierarchy: [(level, "## title"), ...]
+        header_context = ""
+        has_headers = False
+        section_start = 0
 
-        parts = []
-        for level, title in header_stack:
-            prefix = "#" * level
-            parts.append(f"{prefix} {title}")
+        for line_start in _line_start_hashes(text):
+            line_end = text.find("\n", line_start)
+            if line_end == -1:
+                line_end = len(text)
+            line = text[line_start:line_end]
 
-        return " / ".join(parts)
+            level = _header_level(line)
+            if not level:
+                # Regular content line that happens to start with '#'
+                continue
+
+            has_headers = True
+            # Save previous section if it has content
+            section_content = text[section_start:line_start].strip()
+            if section_content:
+                yield header_context, section_content
+
+            # Update header stack
+            title = line[level + 1 :].strip()
+
+            # Pop headers at same or higher level
+            while header_stack and header_stack[-1][0] >= level:
+                header_stack.pop()
+
+            # Add new header
+            header_stack.append((level, f"{'#' * level} {title}"))
+            # Interned so every chunk of a section (and repeated headers across
+            # notes) share one string, and equality checks hit the identity fast path
+            header_context = sys.intern(" / ".join(part for _, part in header_stack))
+            section_start = line_end + 1
+
+        # If no headers found at all, treat entire content as one section
+        if not has_headers:
+            if content.strip():
+                yield "", content.strip()
+            return
+
+        # Add final section
+        section_content = text[section_start:].strip()
+        if section_content:
+            yield header_context, section_content
 
     def _process_section(self, section: tuple[str, str]) -> list[Chunk]:
         """
@@ -200,6 +390,11 @@ class MarkdownChunker:
         if not content:
             return []
 
+        # Skip counting a section that cannot fit whole; its paragraphs are
+        # counted next anyway
+        if self._exceeds_target(content):
+            return self._split_by_paragraphs(header_context, content)
+
         token_count = count_tokens(content, self.model)
 
         # If section fits target size, return as-is
@@ -232,49 +427,47 @@ class MarkdownChunker:
             List of chunks
         """
         # Get logical paragraphs (code blocks/tables are single paragraphs)
-        paragraphs = self._get_logical_paragraphs(content)
+        # Materialized once: token counts are batched over the whole section
+        paragraphs = list(self._get_logical_paragraphs(content))
+        # Count each distinct paragraph once; boilerplate often repeats
+        unique_paragraphs = list(dict.fromkeys(paragraphs))
+        token_counts = count_tokens_batch(unique_paragraphs, self.model)
+        para_token_counts = dict(zip(unique_paragraphs, token_counts))
+        # Classify each distinct paragraph once; overlap selection rechecks them
+        protected = {p: self._is_protected_block(p) for p in unique_paragraphs}
 
         chunks = []
         current_chunk_paragraphs = []
+        current_chunk_tokens = []  # Token count per paragraph, parallel to the above
         current_token_count = 0
 
         for paragraph in paragraphs:
-            paragraph = paragraph.strip()
-            if not paragraph:
-                continue
-
-            para_tokens = count_tokens(paragraph, self.model)
-            is_protected = self._is_protected_block(paragraph)
+            para_tokens = para_token_counts[paragraph]
+            is_protected = protected[paragraph]
 
             # FORCE SPLIT for protected blocks to ensure integrity
             # If current paragraph is protected AND we already have content, save current chunk first
             if is_protected and current_chunk_paragraphs:
-                chunk_content = "\n\n".join(current_chunk_paragraphs)
                 chunks.append(
-                    Chunk(
-                        content=chunk_content,
-                        chunk_index=0,
-                        header_context=header_context,
-                        token_count=current_token_count,
-                    )
+                    self._join_chunk(header_context, current_chunk_paragraphs, current_token_count)
                 )
                 current_chunk_paragraphs = []
+                current_chunk_tokens = []
                 current_token_count = 0
 
             # If single paragraph exceeds max size
             if para_tokens > self.max_chunk_size:
                 # Save current chunk if any (already handled for protected above, but good for normal)
                 if current_chunk_paragraphs:
-                    chunk_content = "\n\n".join(current_chunk_paragraphs)
                     chunks.append(
-                        Chunk(
-                            content=chunk_content,
-                            chunk_index=0,
-                            header_context=header_context,
-                            token_count=current_token_count,
+                        self._join_chunk(
+                            header_context,
+                            current_chunk_paragraphs,
+                            current_token_count,
                         )
                     )
                     current_chunk_paragraphs = []
+                    current_chunk_tokens = []
                     current_token_count = 0
 
                 if is_protected:
@@ -297,102 +490,112 @@ class MarkdownChunker:
 
             if would_be_tokens > self.target_chunk_size and current_chunk_paragraphs:
                 # Save current chunk
-                chunk_content = "\n\n".join(current_chunk_paragraphs)
                 chunks.append(
-                    Chunk(
-                        content=chunk_content,
-                        chunk_index=0,
-                        header_context=header_context,
-                        token_count=current_token_count,
-                    )
+                    self._join_chunk(header_context, current_chunk_paragraphs, current_token_count)
                 )
                 
                 # PREPARE OVERLAP: find how many paragraphs to keep for the next chunk
                 # We skip overlap if the current paragraph is protected to avoid splitting it
                 overlap_paragraphs = []
+                overlap_token_list = []
                 overlap_tokens = 0
                 if not is_protected:
-                    for p in reversed(current_chunk_paragraphs):
+                    for p, p_tokens in zip(
+                        reversed(current_chunk_paragraphs), reversed(current_chunk_tokens)
+                    ):
                         # Don't overlap protected blocks into normal chunks as it might break their structure
-                        if self._is_protected_block(p):
+                        if protected[p]:
                             break
-                        p_tokens = count_tokens(p, self.model)
                         if overlap_tokens + p_tokens <= self.chunk_overlap:
-                            overlap_paragraphs.insert(0, p)
+                            overlap_paragraphs.append(p)
+                            overlap_token_list.append(p_tokens)
                             overlap_tokens += p_tokens
                         else:
                             break
-                
+                    overlap_paragraphs.reverse()
+                    overlap_token_list.reverse()
+
                 # Start new chunk with overlap + current paragraph
-                current_chunk_paragraphs = overlap_paragraphs + [paragraph]
+                overlap_paragraphs.append(paragraph)
+                overlap_token_list.append(para_tokens)
+                current_chunk_paragraphs = overlap_paragraphs
+                current_chunk_tokens = overlap_token_list
                 current_token_count = overlap_tokens + para_tokens
             else:
                 # Add to current chunk
                 current_chunk_paragraphs.append(paragraph)
+                current_chunk_tokens.append(para_tokens)
                 current_token_count = would_be_tokens
 
         # Save final chunk
         if current_chunk_paragraphs:
-            chunk_content = "\n\n".join(current_chunk_paragraphs)
             chunks.append(
-                Chunk(
-                    content=chunk_content,
-                    chunk_index=0,
-                    header_context=header_context,
-                    token_count=current_token_count,
-                )
+                self._join_chunk(header_context, current_chunk_paragraphs, current_token_count)
             )
 
         return chunks
 
-    def _get_logical_paragraphs(self, content: str) -> list[str]:
+    def _join_chunk(
+        self,
+        header_context: str,
+        parts: list[str],
+        token_count: int,
+        separator: str = "\n\n",
+    ) -> Chunk:
+        """
+        Build a chunk from its parts with a single join.
+
+        Parts are only materialized into one string when the chunk is
+        closed, so each emitted chunk costs exactly one allocation.
+
+        Args:
+            header_context: Header hierarchy string
+            parts: Paragraphs, sentences or words making up the chunk
+            token_count: Token count already accumulated for the parts
+            separator: String placed between parts
+
+        Returns:
+            Chunk with index 0 (reassigned later)
+        """
+        return Chunk(
+            content=separator.join(parts),
+            chunk_index=0,
+            header_context=header_context,
+            token_count=token_count,
+        )
+
+    def _get_logical_paragraphs(self, content: str) -> Iterator[str]:
         """
         Split content into logical paragraphs, preserving code blocks and tables.
 
         Args:
             content: Markdown content
 
-        Returns:
-            List of paragraph strings
+        Yields:
+            Stripped, non-empty paragraph strings in document order
         """
-        # Regex for fenced code blocks with backreference to handle 3+ ticks
-        # Captures: 1. Full Block, 2. Delimiter
-        # This ensures we match nested blocks correctly (e.g. 4 ticks wrapping 3 ticks)
-        code_block_pattern = r"((`{3,})[\s\S]*?\2)"
-        
-        # parts will be [text, FULL_BLOCK, DELIMIT, text, FULL_BLOCK, DELIMIT...]
-        parts = re.split(code_block_pattern, content)
-        
-        logical_paragraphs = []
-        
-        # Iterate manually to handle the capturing groups structure
-        i = 0
-        while i < len(parts):
-            text_part = parts[i]
+        for text_part, block_part in _scan_fenced_blocks(content):
             if text_part.strip():
-                # This is normal text (potentially containing tables)
-                sub_paragraphs = re.split(r"\n\s*\n", text_part)
-                for sub in sub_paragraphs:
-                    if sub.strip():
-                        logical_paragraphs.append(sub.strip())
-            
-            # Check if there is a block following
-            if i + 1 < len(parts):
-                block_part = parts[i+1]
-                # delimiter_part = parts[i+2] (We ignore this)
-                if block_part.strip():
-                    logical_paragraphs.append(block_part.strip())
-                
-                i += 3 # Skip text, block, delim
-            else:
-                i += 1
-                        
-        return logical_paragraphs
+                # This is normal text (potentially containing tables);
+                # walk blank-line separators instead of building a split list
+                start = 0
+                for match in _PARA_RE.finditer(text_part):
+                    sub = text_part[start : match.start()].strip()
+                    if sub:
+                        yield sub
+                    start = match.end()
+                sub = text_part[start:].strip()
+                if sub:
+                    yield sub
+
+            block_part = block_part.strip()
+            if block_part:
+                yield block_part
 
     def _is_protected_block(self, text: str) -> bool:
         """Check if text is a code block or table."""
-        text = text.strip()
-        return text.startswith("```") or text.startswith("|")
+        # Anchored match skips leading whitespace without copying the text
+        return _PROTECTED_START_RE.match(text) is not None
 
     def _split_by_sentences(self, header_context: str, content: str) -> list[Chunk]:
         """
@@ -406,31 +609,23 @@ class MarkdownChunker:
             List of chunks
         """
         # Split on sentence boundaries (. ! ?) followed by space or newline
-        sentence_pattern = r"(?<=[.!?])\s+"
-        sentences = re.split(sentence_pattern, content)
+        sentences = [s for s in (s.strip() for s in _split_sentences(content)) if s]
 
         chunks = []
         current_chunk_sentences = []
         current_token_count = 0
 
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
-
-            sent_tokens = count_tokens(sentence, self.model)
-
+        for sentence, sent_tokens in zip(sentences, count_tokens_batch(sentences, self.model)):
             # If single sentence exceeds max, hard split it
             if sent_tokens > self.max_chunk_size:
                 # Save current chunk if any
                 if current_chunk_sentences:
-                    chunk_content = " ".join(current_chunk_sentences)
                     chunks.append(
-                        Chunk(
-                            content=chunk_content,
-                            chunk_index=0,
-                            header_context=header_context,
-                            token_count=current_token_count,
+                        self._join_chunk(
+                            header_context,
+                            current_chunk_sentences,
+                            current_token_count,
+                            separator=" ",
                         )
                     )
                     current_chunk_sentences = []
@@ -445,13 +640,12 @@ class MarkdownChunker:
 
             if would_be_tokens > self.target_chunk_size and current_chunk_sentences:
                 # Save current chunk
-                chunk_content = " ".join(current_chunk_sentences)
                 chunks.append(
-                    Chunk(
-                        content=chunk_content,
-                        chunk_index=0,
-                        header_context=header_context,
-                        token_count=current_token_count,
+                    self._join_chunk(
+                        header_context,
+                        current_chunk_sentences,
+                        current_token_count,
+                        separator=" ",
                     )
                 )
                 # Start new chunk
@@ -464,13 +658,12 @@ class MarkdownChunker:
 
         # Save final chunk
         if current_chunk_sentences:
-            chunk_content = " ".join(current_chunk_sentences)
             chunks.append(
-                Chunk(
-                    content=chunk_content,
-                    chunk_index=0,
-                    header_context=header_context,
-                    token_count=current_token_count,
+                self._join_chunk(
+                    header_context,
+                    current_chunk_sentences,
+                    current_token_count,
+                    separator=" ",
                 )
             )
 
@@ -480,6 +673,10 @@ class MarkdownChunker:
         """
         Hard split content at max_chunk_size (absolute last resort).
 
+        The content is encoded once and cut into windows of max_chunk_size
+        tokens. A window is shortened by a token or two when its end would
+        fall inside a multi-byte character; the rest starts the next window.
+
         Args:
             header_context: Header hierarchy string
             content: Content to split
@@ -488,43 +685,32 @@ class MarkdownChunker:
             List of chunks
         """
         chunks = []
-        words = content.split()
-        current_chunk_words = []
-        current_token_count = 0
-
-        for word in words:
-            word_tokens = count_tokens(word, self.model)
-            would_be_tokens = current_token_count + word_tokens
-
-            if would_be_tokens > self.max_chunk_size and current_chunk_words:
-                # Save current chunk
-                chunk_content = " ".join(current_chunk_words)
+        tokens = encode_text(content, self.model)
+        start = 0
+
+        while start < len(tokens):
+            end = min(start + self.max_chunk_size, len(tokens))
+            # Prefer a shorter window; grow past max only if a single character
+            # spans the whole window (the full remainder always decodes)
+            for stop in chain(range(end, start, -1), range(end + 1, len(tokens) + 1)):
+                try:
+                    chunk_content = decode_tokens(tokens[start:stop], self.model)
+                    break
+                except UnicodeDecodeError:
+                    continue
+            end = stop
+
+            chunk_content = chunk_content.strip()
+            if chunk_content:
                 chunks.append(
                     Chunk(
                         content=chunk_content,
                         chunk_index=0,
                         header_context=header_context,
-                        token_count=current_token_count,
+                        token_count=end - start,
                     )
                 )
-                # Start new chunk
-                current_chunk_words = [word]
-                current_token_count = word_tokens
-            else:
-                current_chunk_words.append(word)
-                current_token_count = would_be_tokens
-
-        # Save final chunk
-        if current_chunk_words:
-            chunk_content = " ".join(current_chunk_words)
-            chunks.append(
-                Chunk(
-                    content=chunk_content,
-                    chunk_index=0,
-                    header_context=header_context,
-                    token_count=current_token_count,
-                )
-            )
+            start = end
 
         return chunks
 
@@ -536,48 +722,94 @@ class MarkdownChunker:
             chunks: List of chunks to potentially merge
 
         Returns:
-            List of chunks with small ones merged
+            List of chunks with small ones merged, indexed in order
         """
         if not chunks:
             return chunks
 
-        merged = []
-        current_chunk = chunks[0]
+        # Group runs of chunks that merge together, then join each group once
+        groups = [[chunks[0]]]
+        group_tokens = chunks[0].token_count
 
         for next_chunk in chunks[1:]:
             # Check if chunks have same header context and combined size is acceptable
-            same_context = current_chunk.header_context == next_chunk.header_context
-            combined_tokens = current_chunk.token_count + next_chunk.token_count
-            current_is_small = current_chunk.token_count < self.min_chunk_size
+            same_context = groups[-1][0].header_context == next_chunk.header_context
+            combined_tokens = group_tokens + next_chunk.token_count
+            current_is_small = group_tokens < self.min_chunk_size
+
+            if (
+                same_context
+                and current_is_small
+                and combined_tokens <= self.target_chunk_size
+                and combined_tokens * 10 >= self.target_chunk_size * 9
+            ):
+                # BPE counts are not additive across the "\n\n" join, so
+                # near the target check the merged text's real count
+                combined_tokens = count_tokens(
+                    "\n\n".join(chunk.content for chunk in (*groups[-1], next_chunk)),
+                    self.model,
+                )
 
             if same_context and current_is_small and combined_tokens <= self.target_chunk_size:
-                # Merge chunks
-                merged_content = f"{current_chunk.content}\n\n{next_chunk.content}"
-                current_chunk = Chunk(
-                    content=merged_content,
-                    chunk_index=current_chunk.chunk_index,
-                    header_context=current_chunk.header_context,
-                    token_count=combined_tokens,
-                    file_path=current_chunk.file_path,
-                    note_title=current_chunk.note_title,
-                    folder=current_chunk.folder,
-                    tags=current_chunk.tags,
-                )
+                groups[-1].append(next_chunk)
+                group_tokens = combined_tokens
             else:
-                # Can't merge, save current and move to next
-                merged.append(current_chunk)
-                current_chunk = next_chunk
+                # Can't merge, start a new group
+                groups.append([next_chunk])
+                group_tokens = next_chunk.token_count
 
-        # Add final chunk
-        merged.append(current_chunk)
+        # Merged chunks get the exact count of their joined text, in one batch
+        merged_contents = [
+            "\n\n".join(chunk.content for chunk in group) for group in groups if len(group) > 1
+        ]
+        merged_counts = zip(merged_contents, count_tokens_batch(merged_contents, self.model))
 
-        # Reassign indices
-        for i, chunk in enumerate(merged):
-            chunk.chunk_index = i
+        merged = []
+        for group in groups:
+            first = group[0]
+            if len(group) == 1:
+                first.chunk_index = len(merged)
+                merged.append(first)
+                continue
+            content, token_count = next(merged_counts)
+            merged.append(
+                Chunk(
+                    content=content,
+                    chunk_index=len(merged),
+                    header_context=first.header_context,
+                    token_count=token_count,
+                    file_path=first.file_path,
+                    note_title=first.note_title,
+                    folder=first.folder,
+                    tags=first.tags,
+                )
+            )
 
         return merged
 
 
+def _read_markdown(file_path: Path) -> str:
+    """
+    Read a markdown file as text mode would, with one read and one decode.
+
+    Args:
+        file_path: Path to markdown file
+
+    Returns:
+        File content with newlines translated to "\\n"
+
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        IOError: If file can't be read
+    """
+    # No TextIOWrapper; newlines are translated the way text mode would
+    try:
+        data = file_path.read_bytes()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File not found: {file_path}") from None
+    return _normalize_newlines(data.decode("utf-8"))
+
+
 def chunk_markdown_file(
     file_path: Path,
     target_chunk_size: int = 800,
@@ -602,11 +834,7 @@ def chunk_markdown_file(
         FileNotFoundError: If file doesn't exist
         IOError: If file can't be read
     """
-    if not file_path.exists():
-        raise FileNotFoundError(f"File not found: {file_path}")
-
-    with open(file_path, encoding="utf-8") as f:
-        content = f.read()
+    content = _read_markdown(file_path)
 
     chunker = MarkdownChunker(
         target_chunk_size=target_chunk_size,
@@ -616,3 +844,43 @@ def chunk_markdown_file(
     )
 
     return chunker.chunk_markdown(content)
+
+
+def chunk_markdown_files(
+    file_paths: list[Path],
+    target_chunk_size: int = 800,
+    max_chunk_size: int = 1500,
+    min_chunk_size: int = 100,
+    model: str = "text-embedding-3-small",
+    max_workers: int | None = None,
+) -> dict[Path, list[Chunk]]:
+    """
+    Chunk many markdown files in parallel worker processes.
+
+    Files are read here and their text is chunked by
+    MarkdownChunker.chunk_markdown_many.
+
+    Args:
+        file_paths: Paths to markdown files
+        target_chunk_size: Target tokens per chunk
+        max_chunk_size: Maximum tokens per chunk
+        min_chunk_size: Minimum tokens per chunk (merge smaller)
+        model: OpenAI model for token counting
+        max_workers: Worker processes (defaults to the CPU count)
+
+    Returns:
+        Mapping of each path to its chunks, in input order
+
+    Raises:
+        FileNotFoundError: If a file doesn't exist
+        IOError: If a file can't be read
+    """
+    chunker = MarkdownChunker(
+        target_chunk_size=target_chunk_size,
+        max_chunk_size=max_chunk_size,
+        min_chunk_size=min_chunk_size,
+        model=model,
+    )
+    contents = [_read_markdown(path) for path in file_paths]
+
+    return dict(zip(file_paths, chunker.chunk_markdown_many(contents, max_workers=max_workers)))
@@ -1,15 +1,50 @@
-from functools import lru_cache
+import functools
+import threading
+from collections.abc import Callable
+from typing import TypeVar
 
 from crawlers.markdown_crawler import MarkdownChunker
 from repositories.snippet_repository import VectorStore
 from services.embedding_service import EmbeddingService
-from services.embedding_service import EmbeddingService
 from services.indexer_service import VaultIndexer
 from services.rerank_service import RerankService
 from settings import get_settings
 
+T = TypeVar("T")
+
+# Reentrant so a factory can build the services it depends on (get_indexer)
+_init_lock = threading.RLock()
+
+
+def _singleton(factory: Callable[[], T]) -> Callable[[], T]:
+    """
+    Turn a zero-argument factory into a lazily built, process-wide instance.
+
+    Once built, the instance is returned without hashing or locking;
+    the first build is guarded by a lock so concurrent first callers
+    never construct two services. cache_clear() drops the instance.
+    """
+    instance: T | None = None
+
+    @functools.wraps(factory)
+    def get() -> T:
+        nonlocal instance
+        if instance is None:
+            with _init_lock:
+                if instance is None:
+                    instance = factory()
+        return instance
+
+    def cache_clear() -> None:
+        nonlocal instance
+        with _init_lock:
+            instance = None
+
+    get.cache_clear = cache_clear
+    return get
 
-@lru_cache
+
+@_singleton
 def get_rerank_service() -> RerankService:
     settings = get_settings()
     return RerankService(
@@ -18,7 +53,7 @@ def get_rerank_service() -> RerankService:
     )
 
 
-@lru_cache
+@_singleton
 def get_vector_store() -> VectorStore:
     settings = get_settings()
     return VectorStore(
@@ -26,8 +61,7 @@ def get_vector_store() -> VectorStore:
     )
 
 
-@lru_cache
-def get_embedding_service() -> EmbeddingService:
+def _build_embedding_service() -> EmbeddingService:
     settings = get_settings()
     return EmbeddingService(
         api_key=settings.embedding.openai_api_key,
@@ -36,7 +70,12 @@ def get_embedding_service() -> EmbeddingService:
     )
 
 
-@lru_cache
+@_singleton
+def get_embedding_service() -> EmbeddingService:
+    return _build_embedding_service()
+
+
+@_singleton
 def get_chunker() -> MarkdownChunker:
     settings = get_settings()
     return MarkdownChunker(
@@ -46,7 +85,7 @@ def get_chunker() -> MarkdownChunker:
     )
 
 
-@lru_cache
+@_singleton
 def get_indexer() -> VaultIndexer:
     settings = get_settings()
     return VaultIndexer(
@@ -66,11 +105,7 @@ def get_fresh_indexer() -> VaultIndexer:
     # VectorStore is thread-safe (ChromaDB uses SQLite/DuckDB locking or client logic),
     # but EmbeddingService (AsyncOpenAI/httpx) is not loop-safe if shared.
 
-    fresh_embedding_service = EmbeddingService(
-        api_key=settings.embedding.openai_api_key,
-        model=settings.embedding.model,
-        batch_size=settings.embedding.batch_size,
-    )
+    fresh_embedding_service = _build_embedding_service()
 
     return VaultIndexer(
         vault_path=settings.obsidian_vault_path,
@@ -2,13 +2,25 @@ import logging
 import os
 import sys
 
+# The stderr handler installed by setup_logging, while it is still in place
+_handler: logging.Handler | None = None
+
 
 def setup_logging():
     """
     Configure the root logger for the application.
     Output: Standard Error (stderr) - best for container logs.
     Format: [Timestamp] [Level] [Module] Message
+
+    Repeated calls return at once while the handler installed by the first
+    call is still attached to the root logger.
     """
+    global _handler
+
+    root_logger = logging.getLogger()
+    if _handler is not None and _handler in root_logger.handlers:
+        return root_logger
+
     log_level_str = os.environ.get("LOG_LEVEL", "INFO").upper()
     log_level = getattr(logging, log_level_str, logging.INFO)
 
@@ -18,17 +30,15 @@ def setup_logging():
     )
 
     # Configure root logger
-    root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
 
     # Clear existing handlers to avoid duplication
-    if root_logger.handlers:
-        root_logger.handlers.clear()
+    root_logger.handlers.clear()
 
     # Add console handler (stderr)
-    handler = logging.StreamHandler(sys.stderr)
-    handler.setFormatter(formatter)
-    root_logger.addHandler(handler)
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(formatter)
+    root_logger.addHandler(_handler)
 
     # Set libraries (like httpx/uvicorn) to WARNING to reduce noise unless DEBUG is on
     if log_level > logging.DEBUG:
@@ -8,16 +8,20 @@ safe credential rotation across multiple Qwen OAuth accounts.
 from __future__ import annotations
 
 import fcntl
+import functools
 import json
+import logging
+import logging.handlers
 import os
+import tempfile
+import threading
 from dataclasses import dataclass, field
 from datetime import datetime
-from enum import Enum
+from enum import IntEnum
+from operator import itemgetter
 from pathlib import Path
 from typing import Any, Final, Callable, TypeVar
 
-import yaml
-
 from logger import get_logger
 
 logger = get_logger(__name__)
@@ -34,14 +38,114 @@ STATE_FILE: Final[str] = "state.yaml"
 ROTATION_LOG: Final[str] = "rotation.log"
 
 
-class SwitchReason(Enum):
+# Lock file descriptors, opened once per lock path and shared by every
+# AccountManager in the process. POSIX record locks (lockf) belong to the
+# process and are dropped when any descriptor for the file is closed, and
+# they do not exclude threads of the same process; so descriptors are never
+# closed while in use and _PROCESS_LOCK serializes the threads. Both the
+# table and the descriptors are only touched while holding _PROCESS_LOCK.
+_LOCK_FDS: dict[Path, int] = {}
+_PROCESS_LOCK = threading.Lock()
+
+
+def _open_lock_fd(lock_file: Path) -> int:
+    """
+    Return the process-wide descriptor for a lock file, opening it if needed.
+
+    Args:
+        lock_file: Path to the lock file.
+
+    Returns:
+        File descriptor of the lock file.
+    """
+    fd = _LOCK_FDS.get(lock_file)
+    if fd is None:
+        # No O_TRUNC: the lock file's content is never used
+        fd = os.open(lock_file, os.O_WRONLY | os.O_CREAT | os.O_CLOEXEC, 0o644)
+        _LOCK_FDS[lock_file] = fd
+    return fd
+
+
+def _is_lock_file_current(lock_file: Path, lock_fd: int) -> bool:
+    """Check that lock_fd still refers to the file at lock_file's path."""
+    try:
+        return os.fstat(lock_fd).st_ino == os.stat(lock_file).st_ino
+    except FileNotFoundError:
+        return False
+
+
+def _stat_key(st: os.stat_result) -> tuple[int, int, int]:
+    """Identify a version of the state file by inode, mtime and size."""
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def _load_legacy_yaml(raw: bytes) -> Any:
+    """
+    Parse a state file written as YAML by an older version or by hand.
+
+    PyYAML is imported here rather than at module level: current state
+    files are JSON, so most processes never need it.
+
+    Args:
+        raw: File content.
+
+    Returns:
+        Parsed document.
+
+    Raises:
+        ValueError: If the content is not valid YAML either.
+    """
+    import yaml
+
+    # Prefer the libyaml C backend; fall back to the pure-Python loader
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    try:
+        return yaml.load(raw, Loader=loader)
+    except yaml.YAMLError as e:
+        raise ValueError(f"Invalid state file: {e}") from e
+
+
+@functools.lru_cache(maxsize=None)
+def _get_audit_logger(log_file: Path) -> logging.Logger:
+    """
+    Return a logger that appends raw JSON lines to a rotation log.
+
+    The logger is not registered with logging.getLogger(), so it never
+    propagates to the application's handlers. Its handler keeps the log
+    open for the rest of the process instead of reopening it on every
+    switch, and only reopens it if the file is rotated or deleted.
+
+    Args:
+        log_file: Path to the rotation log.
+
+    Returns:
+        Logger writing to log_file.
+    """
+    audit = logging.Logger(f"{__name__}.rotation", logging.INFO)
+    handler = logging.handlers.WatchedFileHandler(
+        log_file, mode="a", encoding="utf-8", delay=True
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    audit.addHandler(handler)
+    return audit
+
+
+class SwitchReason(IntEnum):
     """Reason for account switch."""
-    AUTO_QUOTA = "auto_quota"
-    MANUAL = "manual"
-    TEST = "test"
+    AUTO_QUOTA = 1
+    MANUAL = 2
+    TEST = 3
+
+
+# Audit log ("reason", "trigger") fields for each SwitchReason
+_REASON_LOG_FIELDS: Final[dict[int, tuple[str, str]]] = {
+    SwitchReason.AUTO_QUOTA: ("auto_quota", "auto"),
+    SwitchReason.MANUAL: ("manual", "manual"),
+    SwitchReason.TEST: ("test", "manual"),
+}
 
 
-@dataclass
+@dataclass(slots=True)
 class AccountStats:
     """Statistics for a single account."""
     switches_count: int = 0
@@ -63,7 +167,7 @@ class AccountStats:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class RotationState:
     """Complete rotation state."""
     current_index: int = 1
@@ -113,7 +217,7 @@ class AccountManager:
     Manages Qwen account rotation with atomic operations.
 
     This class provides thread-safe account switching using:
-    - File locking (flock) to prevent race conditions
+    - File locking (POSIX lockf, also honoured over NFS) to prevent race conditions
     - Atomic symlink updates via os.replace()
     - Persistent state tracking in state.yaml
     - Audit logging to rotation.log
@@ -146,6 +250,11 @@ class AccountManager:
         self.accounts_dir = self.qwen_dir / ACCOUNTS_DIR_NAME
         self.creds_link = self.qwen_dir / OAUTH_CREDS_LINK
         self.log_file = self.qwen_dir / ROTATION_LOG
+        # Last parsed state as ((st_ino, st_mtime_ns, st_size), data); an
+        # unchanged state file is served from here without re-reading it.
+        # Writers replace the file, so a foreign write always changes st_ino
+        # even when mtime and size stay the same.
+        self._state_cache: tuple[tuple[int, int, int], dict[str, Any]] | None = None
 
     def get_state(self) -> RotationState:
         """
@@ -154,14 +263,27 @@ class AccountManager:
         Returns:
             Current RotationState, or default if state file doesn't exist.
         """
-        if not self.state_file.exists():
-            return RotationState(total_accounts=self.total_accounts)
-
         try:
-            with open(self.state_file, "r") as f:
-                data = yaml.safe_load(f) or {}
+            cached = self._state_cache
+            if cached is not None and cached[0] == _stat_key(os.stat(self.state_file)):
+                # from_dict builds fresh objects, so callers may mutate the result
+                return RotationState.from_dict(cached[1])
+
+            with open(self.state_file, "rb") as f:
+                # Key on the opened file so a concurrent replace cannot pair
+                # new contents with an old key
+                key = _stat_key(os.fstat(f.fileno()))
+                raw = f.read()
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                # Written as YAML by an older version or edited by hand
+                data = _load_legacy_yaml(raw) or {}
+            self._state_cache = (key, data)
             return RotationState.from_dict(data)
-        except (yaml.YAMLError, IOError) as e:
+        except FileNotFoundError:
+            return RotationState(total_accounts=self.total_accounts)
+        except (ValueError, IOError) as e:
             logger.error(f"Failed to read state file: {e}")
             return RotationState(total_accounts=self.total_accounts)
 
@@ -169,24 +291,35 @@ class AccountManager:
         """
         Write state file atomically.
 
-        Uses a temporary file and os.replace() for atomicity.
+        Uses a uniquely named temporary file in the state file's own
+        directory, fsync()ed before os.replace(), so the rename never crosses
+        filesystems and never exposes a partially written file. The state is
+        written as JSON, which parses far faster than YAML and is still a
+        valid YAML document for anything reading state.yaml as YAML.
 
         Args:
             state: State to write.
         """
-        temp_file = self.state_file.with_suffix(".tmp")
+        data = state.to_dict()
+        temp_file = None
         try:
-            with open(temp_file, "w") as f:
-                yaml.dump(state.to_dict(), f, default_flow_style=False)
+            fd, temp_file = tempfile.mkstemp(
+                dir=self.state_file.parent, prefix=".state.", suffix=".tmp"
+            )
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
             os.replace(temp_file, self.state_file)
+            self._state_cache = (_stat_key(os.stat(self.state_file)), data)
         except (IOError, OSError) as e:
             logger.error(f"Failed to write state file: {e}")
             # Clean up temp file if it exists
-            if temp_file.exists():
-                temp_file.unlink()
+            if temp_file is not None and os.path.exists(temp_file):
+                os.unlink(temp_file)
             raise
 
-    def _validate_account_exists(self, index: int) -> Path:
+    def _validate_account_exists(self, index: int) -> str:
         """
         Validate that account credential file exists.
 
@@ -199,14 +332,15 @@ class AccountManager:
         Raises:
             AccountNotFoundError: If credential file doesn't exist.
         """
-        creds_file = self.accounts_dir / f"oauth_creds_{index}.json"
-        if not creds_file.exists():
+        # Plain string paths: one join and one stat, no pathlib objects
+        creds_file = os.path.join(self.accounts_dir, f"oauth_creds_{index}.json")
+        if not os.path.exists(creds_file):
             raise AccountNotFoundError(
                 f"Account {index} credentials not found: {creds_file}"
             )
         return creds_file
 
-    def _atomic_symlink_update(self, target: Path) -> None:
+    def _atomic_symlink_update(self, target: str | Path) -> None:
         """
         Atomically update the oauth_creds.json symlink.
 
@@ -215,30 +349,35 @@ class AccountManager:
         Args:
             target: Path to target credential file.
         """
-        temp_link = self.creds_link.with_suffix(".json.tmp")
+        temp_link = os.fspath(self.creds_link.with_suffix(".json.tmp"))
 
         try:
-            # Remove temp link if it exists
-            if temp_link.exists():
-                temp_link.unlink()
+            # Remove a stale temp link left by an interrupted switch
+            try:
+                os.unlink(temp_link)
+            except FileNotFoundError:
+                pass
 
             # Create temporary symlink
-            temp_link.symlink_to(target)
+            os.symlink(os.fspath(target), temp_link)
 
             # Atomic replace
             os.replace(temp_link, self.creds_link)
 
         except OSError as e:
             logger.error(f"Failed to update symlink: {e}")
-            # Clean up temp file if it exists
-            if temp_link.exists():
-                temp_link.unlink()
+            # Clean up temp link if it exists
+            try:
+                os.unlink(temp_link)
+            except FileNotFoundError:
+                pass
             raise
 
     def _update_account_stats(
         self,
         state: RotationState,
         account_index: int,
+        now_iso: str,
     ) -> None:
         """
         Update statistics for an account after switch.
@@ -246,6 +385,7 @@ class AccountManager:
         Args:
             state: State to update.
             account_index: Index of account being switched to.
+            now_iso: ISO timestamp of the switch.
         """
         account_key = f"account{account_index}"
         if account_key not in state.accounts:
@@ -253,13 +393,14 @@ class AccountManager:
 
         stats = state.accounts[account_key]
         stats.switches_count += 1
-        stats.last_used = datetime.now().isoformat()
+        stats.last_used = now_iso
 
     def _log_switch(
         self,
         from_index: int,
         to_index: int,
         reason: SwitchReason,
+        now_iso: str | None = None,
     ) -> None:
         """
         Log switch event to rotation.log.
@@ -268,22 +409,20 @@ class AccountManager:
             from_index: Previous account index.
             to_index: New account index.
             reason: Reason for the switch.
+            now_iso: ISO timestamp of the switch. Defaults to the current time.
         """
+        reason_name, trigger = _REASON_LOG_FIELDS[reason]
         log_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso or datetime.now().isoformat(),
             "level": "INFO",
             "event": "account_switch",
             "from": from_index,
             "to": to_index,
-            "reason": reason.value,
-            "trigger": "auto" if reason == SwitchReason.AUTO_QUOTA else "manual",
+            "reason": reason_name,
+            "trigger": trigger,
         }
 
-        try:
-            with open(self.log_file, "a") as f:
-                f.write(json.dumps(log_entry) + "\n")
-        except IOError as e:
-            logger.error(f"Failed to write to rotation log: {e}")
+        _get_audit_logger(self.log_file).info(json.dumps(log_entry))
 
     def _with_lock(self, func: Callable[[], T]) -> T:
         """
@@ -298,20 +437,30 @@ class AccountManager:
         Raises:
             LockError: If lock acquisition fails.
         """
-        lock_fd = None
-        try:
-            lock_fd = open(self.lock_file, "w")
-            fcntl.flock(lock_fd.fileno(), fcntl.LOCK_EX)
-            return func()
-        except (IOError, OSError) as e:
-            logger.error(f"Failed to acquire lock: {e}")
-            raise LockError(f"Could not acquire lock: {e}") from e
-        finally:
-            if lock_fd:
-                fcntl.flock(lock_fd.fileno(), fcntl.LOCK_UN)
-                lock_fd.close()
-
-    def switch_to(self, index: int, reason: SwitchReason = SwitchReason.MANUAL) -> bool:
+        with _PROCESS_LOCK:
+            lock_fd = None
+            try:
+                lock_fd = _open_lock_fd(self.lock_file)
+                fcntl.lockf(lock_fd, fcntl.LOCK_EX)
+                if not _is_lock_file_current(self.lock_file, lock_fd):
+                    # The lock file was deleted (e.g. /tmp cleanup) and maybe
+                    # recreated; lock the file other processes will now open
+                    fcntl.lockf(lock_fd, fcntl.LOCK_UN)
+                    os.close(_LOCK_FDS.pop(self.lock_file))
+                    lock_fd = None  # Closed; not to be unlocked below
+                    lock_fd = _open_lock_fd(self.lock_file)
+                    fcntl.lockf(lock_fd, fcntl.LOCK_EX)
+                return func()
+            except (IOError, OSError) as e:
+                logger.error(f"Failed to acquire lock: {e}")
+                raise LockError(f"Could not acquire lock: {e}") from e
+            finally:
+                if lock_fd is not None:
+                    fcntl.lockf(lock_fd, fcntl.LOCK_UN)
+
+    def switch_to(
+        self, index: int, reason: SwitchReason = SwitchReason.MANUAL
+    ) -> tuple[bool, int]:
         """
         Switch to specific account by index.
 
@@ -320,19 +469,24 @@ class AccountManager:
             reason: Reason for the switch.
 
         Returns:
-            True if switch successful.
+            (success, previous_index) tuple.
+            - success: True if switch successful
+            - previous_index: The account index active before the switch
 
         Raises:
+            ValueError: If index is outside the configured accounts.
             AccountNotFoundError: If target account doesn't exist.
             LockError: If lock acquisition fails.
         """
-        def _do_switch() -> bool:
+        def _do_switch() -> tuple[bool, int]:
             state = self.get_state()
             current_index = state.current_index
 
             # Validate index
             if index < 1 or index > state.total_accounts:
-                raise ValueError(f"Invalid account index: {index}")
+                raise ValueError(
+                    f"Invalid account index: {index} (valid range: 1-{state.total_accounts})"
+                )
 
             # Validate credentials exist
             target_creds = self._validate_account_exists(index)
@@ -341,16 +495,18 @@ class AccountManager:
             self._atomic_symlink_update(target_creds)
 
             # Update state
+            # One timestamp for the state, the account stats and the audit log
+            now_iso = datetime.now().isoformat()
             state.current_index = index
-            state.last_switch = datetime.now().isoformat()
+            state.last_switch = now_iso
             state.switches_total += 1
-            self._update_account_stats(state, index)
+            self._update_account_stats(state, index, now_iso)
 
             self._write_state(state)
-            self._log_switch(current_index, index, reason)
+            self._log_switch(current_index, index, reason, now_iso)
 
             logger.info(f"Switched from account{current_index} to account{index}")
-            return True
+            return (True, current_index)
 
         return self._with_lock(_do_switch)
 
@@ -386,13 +542,15 @@ class AccountManager:
             self._atomic_symlink_update(target_creds)
 
             # Update state
+            # One timestamp for the state, the account stats and the audit log
+            now_iso = datetime.now().isoformat()
             state.current_index = next_index
-            state.last_switch = datetime.now().isoformat()
+            state.last_switch = now_iso
             state.switches_total += 1
-            self._update_account_stats(state, next_index)
+            self._update_account_stats(state, next_index, now_iso)
 
             self._write_state(state)
-            self._log_switch(current_index, next_index, reason)
+            self._log_switch(current_index, next_index, reason, now_iso)
 
             logger.info(f"Switched from account{current_index} to account{next_index}")
             return (not wrapped, next_index)
@@ -409,15 +567,21 @@ class AccountManager:
         state = self.get_state()
         result = {}
 
+        # One directory listing instead of a stat() per account
+        try:
+            with os.scandir(self.accounts_dir) as entries:
+                present = {entry.name for entry in entries}
+        except FileNotFoundError:
+            present = set()
+
         for i in range(1, state.total_accounts + 1):
             account_key = f"account{i}"
-            creds_file = self.accounts_dir / f"oauth_creds_{i}.json"
             stats = state.accounts.get(account_key, AccountStats())
 
             result[account_key] = {
                 "index": i,
                 "active": i == state.current_index,
-                "exists": creds_file.exists(),
+                "exists": f"oauth_creds_{i}.json" in present,
                 "switches_count": stats.switches_count,
                 "last_used": stats.last_used,
             }
@@ -431,25 +595,24 @@ class AccountManager:
         Returns:
             Dictionary with usage statistics.
         """
+        # One state read serves both the per-account counts and the totals
         state = self.get_state()
-        accounts = self.list_accounts()
+        accounts = {}
+        for i in range(1, state.total_accounts + 1):
+            account_key = f"account{i}"
+            stats = state.accounts.get(account_key)
+            accounts[account_key] = stats.switches_count if stats else 0
 
         # Find most used account
-        most_used = max(
-            accounts.items(),
-            key=lambda x: x[1]["switches_count"],
-            default=("account1", {"switches_count": 0})
-        )
+        most_used = max(accounts.items(), key=itemgetter(1), default=("account1", 0))
 
         return {
-            "accounts": {
-                k: v["switches_count"] for k, v in accounts.items()
-            },
+            "accounts": accounts,
             "total_switches": state.switches_total,
             "last_switch": state.last_switch,
             "current_account": f"account{state.current_index}",
             "most_used_account": most_used[0],
-            "most_used_count": most_used[1]["switches_count"],
+            "most_used_count": most_used[1],
         }
 
 
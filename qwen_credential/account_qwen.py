@@ -16,6 +16,8 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import functools
+import os
 import shutil
 import sys
 from pathlib import Path
@@ -30,33 +32,41 @@ from qwen_credential.account_manager import (
     SwitchReason,
 )
 
-# ANSI color codes
-GREEN = "\033[92m"
-YELLOW = "\033[93m"
-RED = "\033[91m"
-BLUE = "\033[94m"
-RESET = "\033[0m"
-BOLD = "\033[1m"
+# ANSI color codes, blanked when output is piped or NO_COLOR is set
+_USE_COLOR = sys.stdout.isatty() and "NO_COLOR" not in os.environ
+
+GREEN = "\033[92m" if _USE_COLOR else ""
+YELLOW = "\033[93m" if _USE_COLOR else ""
+RED = "\033[91m" if _USE_COLOR else ""
+BLUE = "\033[94m" if _USE_COLOR else ""
+RESET = "\033[0m" if _USE_COLOR else ""
+BOLD = "\033[1m" if _USE_COLOR else ""
+
+# Message prefixes, formatted once
+_SUCCESS_PREFIX = f"{GREEN}✓{RESET}"
+_WARNING_PREFIX = f"{YELLOW}⚠{RESET}"
+_ERROR_PREFIX = f"{RED}✗{RESET}"
+_INFO_PREFIX = f"{BLUE}ℹ{RESET}"
 
 
 def print_success(msg: str) -> None:
     """Print success message in green."""
-    print(f"{GREEN}✓{RESET} {msg}")
+    print(_SUCCESS_PREFIX, msg)
 
 
 def print_warning(msg: str) -> None:
     """Print warning message in yellow."""
-    print(f"{YELLOW}⚠{RESET} {msg}")
+    print(_WARNING_PREFIX, msg)
 
 
 def print_error(msg: str) -> None:
     """Print error message in red."""
-    print(f"{RED}✗{RESET} {msg}")
+    print(_ERROR_PREFIX, msg)
 
 
 def print_info(msg: str) -> None:
     """Print info message in blue."""
-    print(f"{BLUE}ℹ{RESET} {msg}")
+    print(_INFO_PREFIX, msg)
 
 
 def print_header(msg: str) -> None:
@@ -64,11 +74,24 @@ def print_header(msg: str) -> None:
     print(f"\n{BOLD}{msg}{RESET}\n")
 
 
+# Steps shown before each account's OAuth login
+_ACCOUNT_INSTRUCTIONS = (
+    "To add a new Qwen account:\n"
+    f"  1. Open a {BOLD}NEW terminal{RESET}\n"
+    f"  2. Run: {BOLD}qwen{RESET}\n"
+    "  3. Complete the OAuth login in your browser\n"
+    "  4. When you see the qwen prompt, close that terminal\n"
+    f"  5. Return here and press {BOLD}ENTER{RESET}\n"
+)
+
+
+@functools.lru_cache(maxsize=1)
 def check_qwen_installed() -> bool:
-    """Check if qwen CLI is installed."""
+    """Check if qwen CLI is installed (the PATH is searched once)."""
     return shutil.which("qwen") is not None
 
 
+@functools.lru_cache(maxsize=1)
 def get_qwen_creds_path() -> Path:
     """Get the path to qwen OAuth credentials."""
     return DEFAULT_QWEN_DIR / "oauth_creds.json"
@@ -113,31 +136,24 @@ def setup_accounts(total_accounts: int = DEFAULT_TOTAL_ACCOUNTS) -> int:
     for i in range(1, total_accounts + 1):
         print_header(f"Account {i}/{total_accounts}")
 
-        print("To add a new Qwen account:")
-        print(f"  1. Open a {BOLD}NEW terminal{RESET}")
-        print(f"  2. Run: {BOLD}qwen{RESET}")
-        print(f"  3. Complete the OAuth login in your browser")
-        print(f"  4. When you see the qwen prompt, close that terminal")
-        print(f"  5. Return here and press {BOLD}ENTER{RESET}\n")
+        print(_ACCOUNT_INSTRUCTIONS)
 
-        input("Press ENTER when you have completed the OAuth login...")
+        # Wait for the login, retrying this account until credentials appear
+        while True:
+            input("Press ENTER when you have completed the OAuth login...")
+            if creds_path.exists():
+                break
 
-        # Verify credentials were created
-        if not creds_path.exists():
             print_error(f"No credentials found at {creds_path}")
             retry = input("Try again? (y/N): ").strip().lower()
-            if retry == "y":
-                # Retry this account
-                i -= 1
-                continue
-            else:
+            if retry != "y":
                 return 1
 
         # Move credentials to accounts directory
         target_creds = accounts_dir / f"oauth_creds_{i}.json"
 
         if target_creds.exists():
-            sys.stdout.write(f"{YELLOW}⚠{RESET} Account {i} credentials already exist. Overwrite? (y/N): ")
+            sys.stdout.write(f"{_WARNING_PREFIX} Account {i} credentials already exist. Overwrite? (y/N): ")
             sys.stdout.flush()
             overwrite = input().strip().lower()
             if overwrite != "y":
@@ -218,17 +234,9 @@ def switch_account(index: int | None) -> int:
 
     try:
         if index is not None:
-            # Switch to specific account
-            state = manager.get_state()
-
-            if index < 1 or index > state.total_accounts:
-                print_error(f"Invalid account index: {index}")
-                print(f"Valid range: 1-{state.total_accounts}")
-                return 1
-
-            prev = f"account{state.current_index}"
-            manager.switch_to(index, reason=SwitchReason.MANUAL)
-            print_success(f"Switched from {prev} to account{index}")
+            # Switch to specific account; the index is validated under the lock
+            _, prev_index = manager.switch_to(index, reason=SwitchReason.MANUAL)
+            print_success(f"Switched from account{prev_index} to account{index}")
             print(f"Updated symlink: oauth_creds.json → accounts/oauth_creds_{index}.json")
         else:
             # Switch to next account (silent mode for auto-rotation)
@@ -239,7 +247,7 @@ def switch_account(index: int | None) -> int:
 
         return 0
 
-    except AccountNotFoundError as e:
+    except (ValueError, AccountNotFoundError) as e:
         print_error(str(e))
         return 1
     except LockError as e:
@@ -7,7 +7,10 @@ switching when quota exhaustion is detected.
 
 from __future__ import annotations
 
+import random
+import re
 import subprocess
+import time
 from dataclasses import dataclass
 from enum import Enum
 from typing import Final
@@ -35,6 +38,20 @@ QUOTA_PATTERNS: Final[tuple[str, ...]] = (
     "429",  # Too Many Requests
 )
 
+# All QUOTA_PATTERNS in one case-insensitive pattern, so output is scanned once
+_QUOTA_RE: Final[re.Pattern[str]] = re.compile(
+    "|".join(re.escape(pattern) for pattern in QUOTA_PATTERNS), re.IGNORECASE
+)
+
+# Quota errors are short lines near the end of the output; only this many
+# trailing characters of each stream are scanned
+QUOTA_SCAN_WINDOW: Final[int] = 4096
+
+# Server-suggested wait, e.g. "Retry-After: 3" or "retry after 2.5s"
+_RETRY_AFTER_RE: Final[re.Pattern[str]] = re.compile(
+    r"retry[-_ ]after\D{0,3}(\d+(?:\.\d+)?)", re.IGNORECASE
+)
+
 
 class CallResult(Enum):
     """Result of a Qwen wrapper call."""
@@ -77,6 +94,10 @@ class QwenWrapper:
         self,
         max_retries: int = 5,
         account_manager: AccountManager | None = None,
+        quota_ttl: float = 60.0,
+        backoff_base: float = 0.25,
+        backoff_cap: float = 5.0,
+        jitter: bool = True,
     ) -> None:
         """
         Initialize the QwenWrapper.
@@ -84,22 +105,72 @@ class QwenWrapper:
         Args:
             max_retries: Maximum number of account switches before giving up.
             account_manager: Custom AccountManager instance (for testing).
+            quota_ttl: Seconds a known quota status is reused by check_quota_status.
+            backoff_base: Delay in seconds before the first quota-triggered retry;
+                doubled on each further retry.
+            backoff_cap: Maximum delay in seconds before any retry.
+            jitter: Sleep a uniformly random time up to the delay ("full jitter")
+                rather than the delay itself.
         """
         self.max_retries = max_retries
         self.account_manager = account_manager or AccountManager()
+        self.quota_ttl = quota_ttl
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.jitter = jitter
+        # account index -> (has_quota, monotonic expiry time)
+        self._quota_cache: dict[int, tuple[bool, float]] = {}
+
+    def _remember_quota(self, account: int, has_quota: bool) -> None:
+        """Record an account's observed quota status for quota_ttl seconds."""
+        self._quota_cache[account] = (has_quota, time.monotonic() + self.quota_ttl)
+
+    def _cached_quota(self, account: int) -> bool | None:
+        """Return an account's quota status if still fresh, else None."""
+        entry = self._quota_cache.get(account)
+        if entry is None or time.monotonic() >= entry[1]:
+            return None
+        return entry[0]
 
     def _is_quota_error(self, result: subprocess.CompletedProcess[str]) -> bool:
         """
         Check if subprocess result indicates a quota/rate limit error.
 
+        Only the last QUOTA_SCAN_WINDOW characters of stderr are scanned,
+        then those of stdout if stderr did not match.
+
         Args:
             result: CompletedProcess from subprocess.run()
 
         Returns:
             True if error matches quota patterns.
         """
-        combined = (result.stderr or "").lower() + (result.stdout or "").lower()
-        return any(pattern in combined for pattern in QUOTA_PATTERNS)
+        for output in (result.stderr, result.stdout):
+            if output and _QUOTA_RE.search(output, max(0, len(output) - QUOTA_SCAN_WINDOW)):
+                return True
+        return False
+
+    def _retry_delay(self, attempt: int, result: subprocess.CompletedProcess[str]) -> float:
+        """
+        Compute how long to wait before retrying after a quota error.
+
+        A Retry-After hint in stderr is preferred over exponential backoff;
+        either way the delay never exceeds backoff_cap.
+
+        Args:
+            attempt: Zero-based number of the attempt that failed.
+            result: CompletedProcess of the failed attempt.
+
+        Returns:
+            Delay in seconds.
+        """
+        stderr = result.stderr or ""
+        hint = _RETRY_AFTER_RE.search(stderr, max(0, len(stderr) - QUOTA_SCAN_WINDOW))
+        if hint:
+            return min(self.backoff_cap, float(hint.group(1)))
+
+        delay = min(self.backoff_cap, self.backoff_base * 2**attempt)
+        return random.uniform(0, delay) if self.jitter else delay
 
     def _run_qwen(self, prompt: str, timeout: int) -> subprocess.CompletedProcess[str]:
         """
@@ -164,12 +235,11 @@ class QwenWrapper:
             WrapperResult with success status and output/error.
         """
         accounts_tried: list[int] = []
-        self.account_manager.get_state()  # Get state for side effects (caching)
+        # Read once; after a switch the new index comes back from switch_next
+        current_account = self.account_manager.get_state().current_index
 
         for attempt in range(self.max_retries):
             # Track current account
-            current_state = self.account_manager.get_state()
-            current_account = current_state.current_index
             accounts_tried.append(current_account)
 
             logger.debug(
@@ -182,6 +252,7 @@ class QwenWrapper:
 
             # Check for quota errors
             if self._is_quota_error(result):
+                self._remember_quota(current_account, False)
                 logger.warning(
                     f"Quota exhausted on account {current_account} "
                     f"(attempt {attempt + 1}/{self.max_retries})"
@@ -199,9 +270,7 @@ class QwenWrapper:
                             attempts=attempt + 1,
                             accounts_tried=accounts_tried,
                         )
-                    logger.info(f"Switched to account {next_account}, retrying...")
-                    continue
-
+                    current_account = next_account
                 except (AccountNotFoundError, LockError) as e:
                     logger.error(f"Failed to switch account: {e}")
                     return WrapperResult(
@@ -212,8 +281,18 @@ class QwenWrapper:
                         accounts_tried=accounts_tried,
                     )
 
+                # Back off before retrying, in case the limit is not per-account
+                if attempt < self.max_retries - 1:
+                    delay = self._retry_delay(attempt, result)
+                    logger.info(
+                        f"Switched to account {current_account}, retrying in {delay:.2f}s..."
+                    )
+                    time.sleep(delay)
+                continue
+
             # Success or other error - return result
             if result.returncode == 0:
+                self._remember_quota(current_account, True)
                 logger.debug(f"Qwen call succeeded on attempt {attempt + 1}")
                 return WrapperResult(
                     success=True,
@@ -272,10 +351,11 @@ class QwenWrapper:
         Check quota status of all configured accounts.
 
         This performs a lightweight test call on each account to
-        determine if it has available quota.
+        determine if it has available quota. Accounts whose status was
+        observed within the last quota_ttl seconds, by an earlier check
+        or by call(), are not probed again.
 
-        Note: This is expensive as it requires N test calls.
-        Consider caching results.
+        Note: This is expensive as it requires up to N test calls.
 
         Returns:
             Dict mapping account names to quota availability status.
@@ -283,10 +363,17 @@ class QwenWrapper:
         state = self.account_manager.get_state()
         status: dict[str, bool] = {}
         starting_account = state.current_index
+        switched = False
 
         # Test each account
         for i in range(1, state.total_accounts + 1):
+            cached = self._cached_quota(i)
+            if cached is not None:
+                status[f"account{i}"] = cached
+                continue
+
             # Switch to account
+            switched = True
             try:
                 self.account_manager.switch_to(i)
             except (AccountNotFoundError, LockError) as e:
@@ -298,9 +385,13 @@ class QwenWrapper:
             result = self._run_qwen("test", timeout=10)
             has_quota = not self._is_quota_error(result) and result.returncode == 0
             status[f"account{i}"] = has_quota
+            self._remember_quota(i, has_quota)
 
             logger.info(f"Account {i} quota status: {'available' if has_quota else 'exhausted'}")
 
+        if not switched:
+            return status
+
         # Restore starting account
         try:
             self.account_manager.switch_to(starting_account)
@@ -1,6 +1,9 @@
+import contextlib
 import os
+import re
 import shutil
-from typing import Any, Dict, List, Optional
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import threading
 import numpy as np
 
@@ -8,20 +11,92 @@ import chromadb
 from chromadb.config import Settings
 from chromadb.utils import embedding_functions
 
+# Rows fetched per collection.get call when scanning all metadata
+METADATA_PAGE_SIZE = 10_000
+# Rows written per collection.add call
+ADD_BATCH_SIZE = 2048
+# Separator of list fields (tags, outbound_links) stored as comma-separated strings
+_LIST_SPLIT_RE = re.compile(r"\s*,\s*")
+
 class VectorStore:
     def __init__(self, persist_directory: str, collection_name: str = "obsidian_notes"):
         self.client = chromadb.PersistentClient(path=persist_directory)
         self.collection = self.client.get_or_create_collection(name=collection_name)
         self._lock = threading.Lock()
+        # (source, file_path) -> content_hash of every indexed file, built by one
+        # metadata scan on first use and then kept in step with add_chunks and
+        # delete_by_file_path
+        self._file_hashes: Optional[Dict[Tuple[Optional[str], str], Optional[str]]] = None
+
+    def _iter_metadatas(self, page_size: int = METADATA_PAGE_SIZE) -> Iterator[List[Dict]]:
+        """Yield the metadata of every chunk, one page of at most page_size rows at a time."""
+        offset = 0
+        while True:
+            page = self.collection.get(include=["metadatas"], limit=page_size, offset=offset)["metadatas"] or []
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            offset += page_size
+
+    def _ensure_file_hashes(self) -> Dict[Tuple[Optional[str], str], Optional[str]]:
+        """Return the indexed-file hashes, scanning metadata once if needed. Call with _lock held."""
+        if self._file_hashes is None:
+            self._file_hashes = {
+                (meta.get("source"), meta["file_path"]): meta.get("content_hash")
+                for page in self._iter_metadatas()
+                for meta in page
+                if "file_path" in meta
+            }
+        return self._file_hashes
 
-    def add_chunks(self, chunks: List[Any], metadatas: List[Dict], ids: List[str], embeddings: Optional[List[List[float]]] = None):
+    def _client_max_batch_size(self) -> Optional[int]:
+        """Largest add the client accepts: get_max_batch_size() on newer chromadb, max_batch_size on 0.4.x."""
+        get_max_batch_size = getattr(self.client, "get_max_batch_size", None)
+        if callable(get_max_batch_size):
+            return get_max_batch_size()
+        return getattr(self.client, "max_batch_size", None)
+
+    def add_chunks(
+        self,
+        chunks: List[Any],
+        metadatas: List[Dict],
+        ids: List[str],
+        embeddings: Optional[List[List[float]]] = None,
+        batch_size: int = ADD_BATCH_SIZE,
+    ):
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+        # Sub-batches bound the embedding matrix Chroma builds per call, and must
+        # not exceed the largest batch the client accepts
+        client_max = self._client_max_batch_size()
+        if client_max:
+            batch_size = min(batch_size, client_max)
         with self._lock:
-            self.collection.add(
-                documents=chunks,
-                metadatas=metadatas,
-                ids=ids,
-                embeddings=embeddings
-            )
+            end = 0
+            try:
+                for start in range(0, len(ids), batch_size):
+                    end = start + batch_size
+                    self.collection.add(
+                        documents=chunks[start:end],
+                        metadatas=metadatas[start:end],
+                        ids=ids[start:end],
+                        embeddings=embeddings[start:end] if embeddings is not None else None
+                    )
+            except Exception:
+                # Keep the add all-or-nothing: rows left from earlier slices would
+                # carry the file's new content_hash and hide the failed write from
+                # the next incremental scan
+                self._file_hashes = None
+                with contextlib.suppress(Exception):
+                    self.collection.delete(ids=ids[:end])
+                raise
+            if self._file_hashes is not None:
+                self._file_hashes.update(
+                    ((meta.get("source"), meta["file_path"]), meta.get("content_hash"))
+                    for meta in metadatas
+                    if "file_path" in meta
+                )
 
     def query(self, query_embedding: List[float], n_results: int = 5, where: Optional[Dict] = None) -> Dict[str, Any]:
         return self.collection.query(
@@ -42,9 +117,19 @@ class VectorStore:
             else:
                 where_clause = {"file_path": file_path}
             self.collection.delete(where=where_clause)
+            if self._file_hashes is not None:
+                if source_id:
+                    self._file_hashes.pop((source_id, file_path), None)
+                else:
+                    for key in [key for key in self._file_hashes if key[1] == file_path]:
+                        del self._file_hashes[key]
 
-    def get_by_file_path(self, file_path: str) -> Dict[str, Any]:
-        return self.collection.get(where={"file_path": file_path}, include=["embeddings", "metadatas", "documents"])
+    def get_by_file_path(self, file_path: str, include: Optional[List[str]] = None) -> Dict[str, Any]:
+        # Callers that only need some fields should say so: documents and
+        # embeddings are the bulk of each row
+        if include is None:
+            include = ["embeddings", "metadatas", "documents"]
+        return self.collection.get(where={"file_path": file_path}, include=include)
 
     def get_by_parent_id(self, parent_id: str) -> Dict[str, Any]:
         """Retrieve all chunks belonging to a specific parent document."""
@@ -55,17 +140,13 @@ class VectorStore:
 
     def check_content_hash(self, file_path: str, source_id: str = None) -> Optional[str]:
         if source_id:
-            where_clause = {
-                "$and": [
-                    {"file_path": file_path},
-                    {"source": source_id}
-                ]
-            }
-        else:
-            where_clause = {"file_path": file_path}
+            # Incremental scans ask for every file in turn; answer from the cached
+            # hashes rather than querying Chroma per file
+            with self._lock:
+                return self._ensure_file_hashes().get((source_id, file_path))
 
         results = self.collection.get(
-            where=where_clause,
+            where={"file_path": file_path},
             include=["metadatas"],
             limit=1
         )
@@ -74,79 +155,60 @@ class VectorStore:
         return None
 
     def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total_files = len({path for _, path in self._ensure_file_hashes()})
         return {
             "total_chunks": self.collection.count(),
-            "total_files": len(self.get_all_file_paths()),
+            "total_files": total_files,
             "persist_directory": self.client.get_settings().persist_directory, # Access settings correctly
             "collection_name": self.collection.name
         }
 
     def get_all_file_paths(self, source_id: str = None) -> List[str]:
-        # This is expensive, but Chroma doesn't have a distinct query yet
-        # We fetch only metadatas to be lighter
-        where_filter = None
-        if source_id:
-            where_filter = {"source": source_id}
-            
-        results = self.collection.get(include=["metadatas"], where=where_filter)
-        if results["metadatas"] is None or len(results["metadatas"]) == 0:
-            return []
-        
-        files = set()
-        for meta in results["metadatas"]:
-            if "file_path" in meta:
-                files.add(meta["file_path"])
+        # Chroma doesn't have a distinct query yet, so the paths come from the
+        # cached file hashes, which cost one full metadata scan per process
+        with self._lock:
+            indexed_files = self._ensure_file_hashes()
+            if source_id:
+                files = {path for source, path in indexed_files if source == source_id}
+            else:
+                files = {path for _, path in indexed_files}
         return list(files)
 
     def get_vault_statistics(self) -> Dict[str, Any]:
         """
         Compute detailed vault statistics.
-        This is an expensive operation as it scans all metadata.
+        This is an expensive operation as it scans all metadata, though only
+        one page of it is held in memory at a time.
         """
-        results = self.collection.get(include=["metadatas"])
-        metadatas = results["metadatas"] if results["metadatas"] is not None else []
-        
-        total_chunks = len(metadatas)
+        total_chunks = 0
         files = set()
-        all_tags = []
-        all_links = []
-        
-        for meta in metadatas:
-            files.add(meta.get("file_path", "unknown"))
-            
-            # Extract tags (stored as comma-separated string)
-            tags_str = meta.get("tags", "")
-            if tags_str:
-                all_tags.extend([t.strip() for t in tags_str.split(",") if t.strip()])
-                
-            # Extract outbound links (stored as comma-separated string)
-            links_str = meta.get("outbound_links", "")
-            if links_str:
-                # Links format: [[Target]] or [[Target|Alias]]
-                # We just want to count them for now
-                raw_links = [l.strip() for l in links_str.split(",") if l.strip()]
-                all_links.extend(raw_links)
-
-        # Compute aggregations
-        from collections import Counter
-        tag_counts = Counter(all_tags)
-        
-        # Parse links to get target notes
-        link_targets = []
-        for l in all_links:
-            # Simple parsing: take content before | or #
-            target = l.split("|")[0].split("#")[0].strip()
-            link_targets.append(target)
-            
-        link_counts = Counter(link_targets)
+        tag_counts = Counter()
+        link_counts = Counter()
+
+        split = _LIST_SPLIT_RE.split
+        for page in self._iter_metadatas():
+            total_chunks += len(page)
+            files.update(meta.get("file_path", "unknown") for meta in page)
+
+            # Tags and outbound links are stored as comma-separated strings
+            tag_counts.update(
+                tag for meta in page if meta.get("tags") for tag in split(meta["tags"].strip()) if tag
+            )
+            # Links format: Target, Target|Alias or Target#Header; count by target note
+            link_counts.update(
+                link.split("|", 1)[0].split("#", 1)[0].strip()
+                for meta in page if meta.get("outbound_links")
+                for link in split(meta["outbound_links"].strip()) if link
+            )
 
         return {
             "total_files": len(files),
             "total_chunks": total_chunks,
-            "total_links": len(all_links),
-            "unique_links": len(set(link_targets)),
-            "total_tags": len(all_tags),
-            "unique_tags": len(set(all_tags)),
+            "total_links": sum(link_counts.values()),
+            "unique_links": len(link_counts),
+            "total_tags": sum(tag_counts.values()),
+            "unique_tags": len(tag_counts),
             "most_linked_notes": [{"note": k, "count": v} for k, v in link_counts.most_common(10)],
             "most_used_tags": [{"tag": k, "count": v} for k, v in tag_counts.most_common(10)]
         }
@@ -243,6 +305,7 @@ class VectorStore:
         with self._lock:
             self.client.delete_collection(self.collection.name)
             self.collection = self.client.create_collection(self.collection.name)
+            self._file_hashes = {}
 
 def create_vector_store(persist_directory: str, collection_name: str = "obsidian_notes") -> VectorStore:
     """Factory function to create a VectorStore instance."""
@@ -409,7 +409,7 @@ async def suggest_links(
         if stored_hash and stored_hash == current_hash:
             # Case A: File unchanged, reuse embeddings!
             # Offload DB fetch
-            file_data = await asyncio.to_thread(vector_store.get_by_file_path, note_path)
+            file_data = await asyncio.to_thread(vector_store.get_by_file_path, note_path, ["embeddings"])
             embeddings = file_data.get("embeddings", [])
         else:
             # Case B: File modified or new, must generate
@@ -2,14 +2,40 @@ import pytest
 from unittest.mock import MagicMock, patch
 from crawlers.markdown_crawler import MarkdownChunker, Chunk
 
+def _tokenizer_available():
+    try:
+        from utils import _get_encoding
+        _get_encoding("text-embedding-3-small")
+        return True
+    except Exception:
+        return False
+
+# For tests that need real token counts; the rest mock the tokenizer and run offline
+requires_tokenizer = pytest.mark.skipif(
+    not _tokenizer_available(), reason="cl100k_base encoding not available offline"
+)
+
 # Mock dependencies
 @pytest.fixture
 def mock_count_tokens():
-    with patch('crawlers.markdown_crawler.count_tokens') as mock:
-        # Default behavior: 1 token per word for simplicity in tests
+    with patch('crawlers.markdown_crawler.count_tokens') as mock, \
+         patch('crawlers.markdown_crawler.count_tokens_batch') as mock_batch, \
+         patch('crawlers.markdown_crawler.max_token_length', return_value=128):
+        # Default behavior: 1 token per word for simplicity in tests;
+        # the length bound matches cl100k_base without loading it
         mock.side_effect = lambda text, model: len(text.split())
+        mock_batch.side_effect = lambda texts, model: [len(t.split()) for t in texts]
         yield mock
 
+@pytest.fixture
+def mock_tokenizer():
+    with patch('crawlers.markdown_crawler.encode_text') as mock_encode, \
+         patch('crawlers.markdown_crawler.decode_tokens') as mock_decode:
+        # Words stand in for token ids, matching mock_count_tokens
+        mock_encode.side_effect = lambda text, model: text.split()
+        mock_decode.side_effect = lambda tokens, model: " ".join(tokens)
+        yield mock_encode
+
 @pytest.fixture
 def mock_remove_frontmatter():
     with patch('crawlers.markdown_crawler.remove_frontmatter') as mock:
@@ -169,7 +195,19 @@ Small3
         assert "Small2" in chunks[0].content
         assert "Small3" in chunks[0].content
 
-    def test_oversized_paragraph_splitting(self, mock_count_tokens, mock_remove_frontmatter):
+    @requires_tokenizer
+    def test_merged_chunk_token_count_is_exact(self, mock_remove_frontmatter):
+        from utils import count_tokens
+
+        chunker = MarkdownChunker(min_chunk_size=10, target_chunk_size=20)
+        content = "# H1\nSmall1\n\n# H1\nSmall2\n\n# H1\nSmall3\n"
+
+        chunks = chunker.chunk_markdown(content)
+
+        assert len(chunks) == 1
+        assert chunks[0].token_count == count_tokens(chunks[0].content)
+
+    def test_oversized_paragraph_splitting(self, mock_count_tokens, mock_tokenizer, mock_remove_frontmatter):
         # Paragraph exceeds max_chunk_size
         chunker = MarkdownChunker(
             target_chunk_size=5,
@@ -221,7 +259,7 @@ Small3
         assert "para2" in chunks[0].content
         assert "para2" in chunks[1].content
 
-    def test_hard_splitting_long_sentence(self, mock_count_tokens, mock_remove_frontmatter):
+    def test_hard_splitting_long_sentence(self, mock_count_tokens, mock_tokenizer, mock_remove_frontmatter):
         chunker = MarkdownChunker(
             target_chunk_size=5,
             max_chunk_size=10
@@ -278,7 +316,7 @@ print("nested")
         assert "Normal para" in chunks[0].content
         assert "```python" in chunks[1].content
 
-    def test_oversized_para_after_content(self, mock_count_tokens, mock_remove_frontmatter):
+    def test_oversized_para_after_content(self, mock_count_tokens, mock_tokenizer, mock_remove_frontmatter):
         chunker = MarkdownChunker(
             target_chunk_size=10,
             max_chunk_size=15
@@ -309,7 +347,15 @@ print("nested")
         assert "b1" in chunks[0].content
         assert "b2" in chunks[1].content
 
-    def test_oversized_sentence_with_existing_content(self, mock_count_tokens, mock_remove_frontmatter):
+    def test_unclosed_fence_left_as_text(self):
+        chunker = MarkdownChunker()
+        content = "Intro\n\n```python\nno close\n\nAfter\n\n" + "` " * 5000
+
+        paragraphs = list(chunker._get_logical_paragraphs(content))
+
+        assert paragraphs[:3] == ["Intro", "```python\nno close", "After"]
+
+    def test_oversized_sentence_with_existing_content(self, mock_count_tokens, mock_tokenizer, mock_remove_frontmatter):
         # We need a SINGLE paragraph where:
         # 1. para_tokens > max_chunk_size (triggers _split_by_sentences)
         # 2. First sentence fits in target_chunk_size
@@ -335,6 +381,64 @@ print("nested")
         assert "Short sent" in chunks[0].content
         assert "word0" in chunks[1].content
 
+    def test_repeated_paragraphs_counted_once(self, mock_count_tokens, mock_remove_frontmatter):
+        chunker = MarkdownChunker(target_chunk_size=4, min_chunk_size=0, chunk_overlap=0)
+        # The same boilerplate paragraph repeated throughout the section
+        content = "\n\n".join(["same para here"] * 6)
+
+        with patch('crawlers.markdown_crawler.count_tokens_batch') as mock_batch:
+            mock_batch.side_effect = lambda texts, model: [len(t.split()) for t in texts]
+            chunks = chunker.chunk_markdown(content)
+
+        assert len(chunks) == 6
+        counted = [t for call in mock_batch.call_args_list for t in call.args[0]]
+        assert counted.count("same para here") == 1
+
+    def test_small_note_without_headers_skips_splitting(self, mock_count_tokens, mock_remove_frontmatter):
+        chunker = MarkdownChunker()
+        content = "\nJust a short note with a #tag.\n\nSecond paragraph.\n"
+
+        with patch.object(MarkdownChunker, '_split_by_headers') as mock_split:
+            chunks = chunker.chunk_markdown(content)
+
+        mock_split.assert_not_called()
+        assert len(chunks) == 1
+        assert chunks[0].content == content.strip()
+        assert chunks[0].header_context == ""
+        assert chunks[0].token_count == 9
+
+    def test_long_note_without_headers_not_counted_whole(self, mock_count_tokens, mock_remove_frontmatter):
+        chunker = MarkdownChunker(target_chunk_size=4, min_chunk_size=0, chunk_overlap=0)
+
+        # Pretend no token spans more than one character
+        with patch('crawlers.markdown_crawler.max_token_length', return_value=1):
+            assert chunker._single_chunk("alpha beta gamma") is None
+
+        mock_count_tokens.assert_not_called()
+
+    def test_oversized_section_not_counted_whole(self, mock_count_tokens, mock_remove_frontmatter):
+        chunker = MarkdownChunker(target_chunk_size=4, min_chunk_size=0, chunk_overlap=0)
+        content = "alpha beta\n\ngamma delta"
+
+        # Pretend no token spans more than one character
+        with patch('crawlers.markdown_crawler.max_token_length', return_value=1):
+            chunks = chunker.chunk_markdown(content)
+
+        assert [c.content for c in chunks] == ["alpha beta\n\ngamma delta"]
+        counted = [c.args[0] for c in mock_count_tokens.call_args_list]
+        assert content not in counted
+
+    @requires_tokenizer
+    def test_hard_split_keeps_multibyte_characters_whole(self, mock_remove_frontmatter):
+        # Real tokenizer: CJK characters span several byte-level tokens
+        chunker = MarkdownChunker(target_chunk_size=3, max_chunk_size=4, min_chunk_size=0)
+        text = "金価格の分析と市場構造" * 4
+
+        chunks = chunker._hard_split("", text)
+
+        assert "".join(c.content for c in chunks) == text
+        assert all("\ufffd" not in c.content for c in chunks)
+
 def test_chunk_markdown_file_not_found():
     from crawlers.markdown_crawler import chunk_markdown_file
     from pathlib import Path
@@ -352,3 +456,141 @@ def test_chunk_markdown_file_success(tmp_path, mock_count_tokens, mock_remove_fr
     
     assert len(chunks) == 1
     assert chunks[0].header_context == "# Header"
+
+
+@requires_tokenizer
+def test_chunk_markdown_files_parallel(tmp_path):
+    from crawlers.markdown_crawler import chunk_markdown_file, chunk_markdown_files
+
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"note{i}.md"
+        path.write_text(f"# Note {i}\nBody of note {i}.")
+        paths.append(path)
+
+    results = chunk_markdown_files(paths, max_workers=2)
+
+    assert list(results) == paths
+    for path in paths:
+        assert results[path] == chunk_markdown_file(path)
+
+@requires_tokenizer
+def test_chunk_markdown_file_matches_text_mode(tmp_path):
+    from crawlers.markdown_crawler import chunk_markdown_file
+
+    path = tmp_path / "note.md"
+    path.write_bytes("# Title\r\nCaf\u00e9 body.\r\n\r\nSecond\rparagraph.".encode("utf-8"))
+    with open(path, encoding="utf-8") as f:
+        expected = MarkdownChunker().chunk_markdown(f.read())
+
+    assert chunk_markdown_file(path) == expected
+
+    with pytest.raises(FileNotFoundError, match="File not found"):
+        chunk_markdown_file(tmp_path / "missing.md")
+
+@requires_tokenizer
+def test_chunk_markdown_many_parallel():
+    chunker = MarkdownChunker(target_chunk_size=100, max_chunk_size=200, min_chunk_size=10)
+    contents = [f"# Note {i}\nBody of note {i}." for i in range(3)]
+
+    results = chunker.chunk_markdown_many(contents, max_workers=2)
+
+    assert results == [chunker.chunk_markdown(content) for content in contents]
+
+def test_parallel_chunking_spawns_workers(tmp_path):
+    from crawlers.markdown_crawler import chunk_markdown_files
+
+    paths = [tmp_path / "a.md", tmp_path / "b.md"]
+    for path in paths:
+        path.write_text("# Note\nBody.")
+
+    with patch('crawlers.markdown_crawler.ProcessPoolExecutor') as mock_pool:
+        executor = mock_pool.return_value.__enter__.return_value
+        executor.map.return_value = [[], []]
+        results = chunk_markdown_files(paths, max_workers=2)
+
+    # Files are read in the parent; the pool chunks their text
+    assert executor.map.call_args.args[1] == ["# Note\nBody.", "# Note\nBody."]
+    assert mock_pool.call_args.kwargs["mp_context"].get_start_method() == "spawn"
+    assert results == {paths[0]: [], paths[1]: []}
+
+def test_count_tokens_cached_across_calls():
+    import utils
+
+    encoding = MagicMock()
+    encoding.encode.side_effect = lambda text: text.split()
+    encoding.encode_batch.side_effect = lambda texts: [t.split() for t in texts]
+    utils._TOKEN_COUNT_CACHE.clear()
+
+    with patch('utils._get_encoding', return_value=encoding):
+        assert utils.count_tokens("cached footer text", "m") == 3
+        assert utils.count_tokens("cached footer text", "m") == 3
+        assert utils.count_tokens_batch(["cached footer text", "new"], "m") == [3, 1]
+
+    # Only the uncached text is encoded; one miss is not worth a thread pool
+    assert encoding.encode.call_count == 2
+    encoding.encode.assert_called_with("new")
+    encoding.encode_batch.assert_not_called()
+    utils._TOKEN_COUNT_CACHE.clear()
+
+
+def test_token_count_cache_evicts_least_recently_used():
+    import utils
+
+    encoding = MagicMock()
+    encoding.encode.side_effect = lambda text: text.split()
+    utils._TOKEN_COUNT_CACHE.clear()
+
+    with patch('utils._get_encoding', return_value=encoding), \
+         patch('utils.TOKEN_COUNT_CACHE_SIZE', 2):
+        utils.count_tokens("first text", "m")
+        utils.count_tokens("second text here", "m")
+        utils.count_tokens("first text", "m")  # now most recently used
+        utils.count_tokens("third", "m")  # evicts "second text here"
+        assert encoding.encode.call_count == 3
+
+        utils.count_tokens("first text", "m")
+        assert encoding.encode.call_count == 3
+        utils.count_tokens("second text here", "m")
+        assert encoding.encode.call_count == 4
+
+    # Keys hold a fixed-size digest, never the text itself
+    assert all(len(digest) == 16 for _, digest in utils._TOKEN_COUNT_CACHE)
+    utils._TOKEN_COUNT_CACHE.clear()
+
+
+def test_count_tokens_batch_threads_large_batches():
+    import utils
+
+    encoding = MagicMock()
+    encoding.encode_batch.side_effect = lambda texts, num_threads: [t.split() for t in texts]
+    texts = [f"text number {i}" for i in range(utils.BATCH_THREAD_MIN)]
+    utils._TOKEN_COUNT_CACHE.clear()
+
+    with patch('utils._get_encoding', return_value=encoding), \
+         patch('utils._BATCH_THREADS', 4):
+        assert utils.count_tokens_batch(texts, "m") == [3] * len(texts)
+
+    encoding.encode_batch.assert_called_once_with(texts, num_threads=4)
+    encoding.encode.assert_not_called()
+    utils._TOKEN_COUNT_CACHE.clear()
+
+def test_section_tokens_reused_across_chunkers():
+    import utils
+
+    encoding = MagicMock()
+    encoding.encode.side_effect = lambda text: text.split()
+    encoding.encode_batch.side_effect = lambda texts: [t.split() for t in texts]
+    utils._TOKEN_COUNT_CACHE.clear()
+    content = "# Shared\n" + "\n\n".join(f"Paragraph number {i} here." for i in range(6))
+
+    with patch('utils._get_encoding', return_value=encoding), \
+         patch('crawlers.markdown_crawler.max_token_length', return_value=128):
+        first = MarkdownChunker(target_chunk_size=8, min_chunk_size=0).chunk_markdown(content)
+        calls = encoding.encode.call_count + encoding.encode_batch.call_count
+        second = MarkdownChunker(target_chunk_size=8, min_chunk_size=0).chunk_markdown(content)
+
+    assert first == second
+    # The section and each paragraph were tokenized by the first chunker only
+    assert encoding.encode.call_count + encoding.encode_batch.call_count == calls
+    utils._TOKEN_COUNT_CACHE.clear()
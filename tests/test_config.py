@@ -0,0 +1,357 @@
+"""
+Unit tests for YAML configuration loading.
+
+Tests cover:
+- Parse caching keyed by file identity
+- Environment variable substitution
+- Required field validation
+"""
+
+from __future__ import annotations
+
+import os
+import stat
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+import config as config_module
+from config import Config, ConfigError, load_config
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+@pytest.fixture(autouse=True)
+def clear_yaml_cache(tmp_path, monkeypatch):
+    """Ensure each test starts with empty parse, sidecar and instance caches."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    config_module._YAML_CACHE.clear()
+    load_config.cache_clear()
+    yield
+    config_module._YAML_CACHE.clear()
+    load_config.cache_clear()
+
+
+@pytest.fixture
+def vault_dir(tmp_path):
+    """Create an empty vault directory."""
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    return vault
+
+
+@pytest.fixture
+def config_file(tmp_path, vault_dir):
+    """Write a minimal valid config.yaml."""
+    path = tmp_path / "config.yaml"
+    path.write_text(
+        f"obsidian_vault_path: {vault_dir}\n"
+        "openai_api_key: sk-test-1234567890\n"
+        "chunking:\n"
+        "  target_chunk_size: 640\n"
+    )
+    return path
+
+
+# =============================================================================
+# Loading Tests
+# =============================================================================
+
+class TestConfigLoading:
+    """Test suite for Config file loading."""
+
+    def test_loads_values(self, config_file, vault_dir):
+        """Test that values and defaults are exposed through properties."""
+        config = Config(str(config_file))
+
+        assert config.vault_path == vault_dir.resolve()
+        assert config.openai_api_key == "sk-test-1234567890"
+        assert config.target_chunk_size == 640
+        assert config.max_chunk_size == 1500
+        assert config.chromadb_path.is_absolute()
+
+    def test_get_supports_dotted_keys(self, config_file):
+        """Test that get() resolves nested keys, subtrees and defaults."""
+        config = Config(str(config_file))
+
+        assert config.get("chunking.target_chunk_size") == 640
+        assert config.get("chunking") == {
+            "target_chunk_size": 640,
+            "max_chunk_size": 1500,
+            "min_chunk_size": 100,
+        }
+        assert config.get("search.default_n_results") == 5
+        assert config.get("chunking.missing", "fallback") == "fallback"
+        assert config.get("openai_api_key.nested") is None
+
+    def test_debounce_env_override(self, config_file, monkeypatch):
+        """Test that DEBOUNCE_SECONDS overrides the configured watcher debounce."""
+        monkeypatch.setenv("DEBOUNCE_SECONDS", "2.5")
+
+        assert Config(str(config_file)).debounce_seconds == 2.5
+
+    def test_repeated_load_reuses_parse(self, config_file):
+        """Test that an unchanged file is only parsed once."""
+        with patch("config.yaml.load", wraps=yaml.load) as mock_load:
+            Config(str(config_file), eager=True)
+            Config(str(config_file), eager=True)
+
+        assert mock_load.call_count == 1
+
+    def test_parse_deferred_until_first_access(self, config_file):
+        """Test that construction alone does not parse the file."""
+        with patch("config.yaml.load", wraps=yaml.load) as mock_load:
+            config = Config(str(config_file))
+            assert mock_load.call_count == 0
+
+            assert config.target_chunk_size == 640
+            assert config.embedding_model == "text-embedding-3-small"
+
+        assert mock_load.call_count == 1
+
+    def test_sidecar_reused_across_processes(self, config_file):
+        """Test that a fresh process reuses the sidecar instead of parsing."""
+        Config(str(config_file), eager=True)
+        # Simulate a new interpreter: only the on-disk sidecar survives
+        config_module._YAML_CACHE.clear()
+
+        with patch("config.yaml.load", wraps=yaml.load) as mock_load:
+            config = Config(str(config_file))
+            assert config.target_chunk_size == 640
+
+        assert mock_load.call_count == 0
+
+    def test_corrupt_sidecar_falls_back_to_parse(self, config_file):
+        """Test that an unreadable sidecar is ignored."""
+        Config(str(config_file), eager=True)
+        config_module._YAML_CACHE.clear()
+        sidecar = config_module._sidecar_path(str(config_file.resolve()))
+        first_line = sidecar.read_text().splitlines()[0]
+        sidecar.write_text(f"{first_line}\n{{not json")
+
+        with patch("config.yaml.load", wraps=yaml.load) as mock_load:
+            assert Config(str(config_file)).target_chunk_size == 640
+
+        assert mock_load.call_count == 1
+
+    def test_sidecar_keyed_on_file_contents(self, config_file):
+        """Test that a same-size edit keeping the mtime is not served from the sidecar."""
+        Config(str(config_file), eager=True)
+        config_module._YAML_CACHE.clear()
+
+        st = config_file.stat()
+        config_file.write_text(config_file.read_text().replace("640", "320"))
+        os.utime(config_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert config_file.stat().st_size == st.st_size
+
+        assert Config(str(config_file)).target_chunk_size == 320
+
+    def test_sidecar_private_to_user(self, config_file, tmp_path):
+        """Test that sidecars, which may hold inline secrets, are owner-only."""
+        Config(str(config_file), eager=True)
+
+        sidecar = config_module._sidecar_path(str(config_file.resolve()))
+        assert sidecar.parent == tmp_path / "cache" / "omni-search-engine"
+        assert stat.S_IMODE(sidecar.stat().st_mode) == 0o600
+        assert stat.S_IMODE(sidecar.parent.stat().st_mode) == 0o700
+
+    def test_modified_file_is_reparsed(self, config_file, vault_dir):
+        """Test that a changed file invalidates the cached parse."""
+        Config(str(config_file), eager=True)
+
+        config_file.write_text(
+            f"obsidian_vault_path: {vault_dir}\n"
+            "openai_api_key: sk-test-1234567890\n"
+            "chunking:\n"
+            "  target_chunk_size: 320\n"
+            "  max_chunk_size: 900\n"
+        )
+
+        config = Config(str(config_file))
+        assert config.target_chunk_size == 320
+        assert config.max_chunk_size == 900
+
+    def test_parsed_config_is_frozen(self, config_file):
+        """Test that the shared parse cannot be mutated through an instance."""
+        first = Config(str(config_file), eager=True)
+
+        with pytest.raises(TypeError):
+            first._config["chunking"]["target_chunk_size"] = 1
+
+        second = Config(str(config_file), eager=True)
+        assert second._config is first._config
+        assert second.target_chunk_size == 640
+
+    def test_load_config_is_memoized(self, config_file, monkeypatch):
+        """Test that load_config returns one shared instance per resolved path."""
+        first = load_config(str(config_file))
+
+        monkeypatch.chdir(config_file.parent)
+        assert load_config("config.yaml") is first
+
+        load_config.cache_clear()
+        assert load_config(str(config_file)) is not first
+
+    def test_load_config_reloads_edited_file(self, config_file):
+        """Test that editing the config file yields a fresh instance."""
+        first = load_config(str(config_file))
+        assert first.target_chunk_size == 640
+
+        config_file.write_text(config_file.read_text().replace("640", "512"))
+        st = config_file.stat()
+        os.utime(config_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        second = load_config(str(config_file))
+        assert second is not first
+        assert second.target_chunk_size == 512
+
+    def test_load_config_retries_after_invalid_file(self, config_file):
+        """Test that a file fixed after failing validation is loaded anew."""
+        valid = config_file.read_text()
+        config_file.write_text("openai_api_key: sk-test-1234567890\n")
+
+        broken = load_config(str(config_file))
+        with pytest.raises(ConfigError):
+            broken.vault_path
+
+        config_file.write_text(valid)
+        st = config_file.stat()
+        os.utime(config_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        assert load_config(str(config_file)).target_chunk_size == 640
+
+    def test_missing_file_raises_error(self, tmp_path):
+        """Test that a missing config path raises ConfigError."""
+        with pytest.raises(ConfigError, match="Config file not found"):
+            Config(str(tmp_path / "missing.yaml"))
+
+    def test_empty_file_raises_error(self, tmp_path):
+        """Test that an empty config file raises ConfigError."""
+        path = tmp_path / "config.yaml"
+        path.write_text("")
+
+        with pytest.raises(ConfigError, match="Invalid config file"):
+            Config(str(path), eager=True)
+
+    def test_non_mapping_raises_error(self, tmp_path):
+        """Test that a non-mapping document raises ConfigError."""
+        path = tmp_path / "config.yaml"
+        path.write_text("- just\n- a list\n")
+
+        with pytest.raises(ConfigError, match="Invalid config file"):
+            Config(str(path), eager=True)
+
+
+# =============================================================================
+# Substitution and Validation Tests
+# =============================================================================
+
+class TestConfigSubstitution:
+    """Test suite for environment variable substitution and validation."""
+
+    def test_env_vars_substituted(self, tmp_path, vault_dir, monkeypatch):
+        """Test that ${VAR} references are replaced from the environment."""
+        monkeypatch.setenv("TEST_OPENAI_KEY", "sk-from-env-12345")
+        monkeypatch.setenv("TEST_MODEL", "small")
+        path = tmp_path / "config.yaml"
+        path.write_text(
+            f"obsidian_vault_path: {vault_dir}\n"
+            "openai_api_key: ${TEST_OPENAI_KEY}\n"
+            "embedding:\n"
+            "  model: text-embedding-3-${TEST_MODEL}\n"
+        )
+
+        config = Config(str(path))
+
+        assert config.openai_api_key == "sk-from-env-12345"
+        assert config.embedding_model == "text-embedding-3-small"
+
+    def test_env_vars_substituted_in_nested_lists(self, tmp_path, vault_dir, monkeypatch):
+        """Test that references inside nested lists and mappings are replaced."""
+        monkeypatch.setenv("TEST_ROOT", "/srv/notes")
+        path = tmp_path / "config.yaml"
+        path.write_text(
+            f"obsidian_vault_path: {vault_dir}\n"
+            "openai_api_key: sk-test-1234567890\n"
+            "sources:\n"
+            "  - id: vault\n"
+            "    paths: [\"${TEST_ROOT}/a\", \"${TEST_ROOT}/b\"]\n"
+        )
+
+        config = Config(str(path))
+
+        assert config.get("sources")[0]["paths"] == ("/srv/notes/a", "/srv/notes/b")
+        assert config.get("sources")[0]["id"] == "vault"
+
+    def test_no_refs_skips_reference_scan(self, config_file):
+        """Test that sources without "${" never walk the tree for references."""
+        with patch("config._find_env_refs") as mock_find:
+            Config(str(config_file), eager=True)
+
+        mock_find.assert_not_called()
+
+    def test_env_vars_resolved_per_load(self, tmp_path, vault_dir, monkeypatch):
+        """Test that cached parses still pick up the current environment."""
+        path = tmp_path / "config.yaml"
+        path.write_text(
+            f"obsidian_vault_path: {vault_dir}\n"
+            "openai_api_key: ${TEST_OPENAI_KEY}\n"
+        )
+
+        monkeypatch.setenv("TEST_OPENAI_KEY", "sk-first-123456")
+        assert Config(str(path)).openai_api_key == "sk-first-123456"
+
+        monkeypatch.setenv("TEST_OPENAI_KEY", "sk-second-123456")
+        assert Config(str(path)).openai_api_key == "sk-second-123456"
+
+    def test_missing_env_var_raises_error(self, tmp_path, vault_dir, monkeypatch):
+        """Test that an unset ${VAR} raises ConfigError."""
+        monkeypatch.delenv("TEST_MISSING_VAR", raising=False)
+        path = tmp_path / "config.yaml"
+        path.write_text(
+            f"obsidian_vault_path: {vault_dir}\n"
+            "openai_api_key: ${TEST_MISSING_VAR}\n"
+        )
+
+        with pytest.raises(ConfigError, match="TEST_MISSING_VAR"):
+            Config(str(path), eager=True)
+
+    def test_missing_required_field_raises_error(self, tmp_path, vault_dir):
+        """Test that a missing required field raises ConfigError."""
+        path = tmp_path / "config.yaml"
+        path.write_text(f"obsidian_vault_path: {vault_dir}\n")
+
+        with pytest.raises(ConfigError, match="openai_api_key"):
+            Config(str(path), eager=True)
+
+    def test_missing_vault_raises_error(self, tmp_path):
+        """Test that a vault path that does not exist raises ConfigError."""
+        path = tmp_path / "config.yaml"
+        path.write_text(
+            f"obsidian_vault_path: {tmp_path / 'nowhere'}\n"
+            "openai_api_key: sk-test-1234567890\n"
+        )
+
+        with pytest.raises(ConfigError, match="Obsidian vault not found"):
+            Config(str(path), eager=True)
+
+    def test_invalid_api_key_raises_error(self, tmp_path, vault_dir):
+        """Test that a malformed API key raises ConfigError."""
+        path = tmp_path / "config.yaml"
+        path.write_text(
+            f"obsidian_vault_path: {vault_dir}\n"
+            "openai_api_key: not-a-key\n"
+        )
+
+        with pytest.raises(ConfigError, match="sk-"):
+            Config(str(path), eager=True)
+
+    def test_repr_masks_api_key(self, config_file):
+        """Test that repr never exposes the full API key."""
+        text = repr(Config(str(config_file)))
+
+        assert "sk-test-1234567890" not in text
+        assert "sk-test...7890" in text
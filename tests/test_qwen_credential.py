@@ -118,11 +118,61 @@ class TestAccountManager:
         assert state.current_index == 1
         assert state.total_accounts == DEFAULT_TOTAL_ACCOUNTS
 
+    def test_get_state_reuses_parse_until_file_changes(self, account_manager):
+        """Test that an unchanged state file is not parsed again."""
+        with patch("yaml.load", wraps=yaml.load) as mock_load:
+            first = account_manager.get_state()
+            first.current_index = 4  # Mutating a result must not leak into the cache
+            assert account_manager.get_state().current_index == 1
+            assert mock_load.call_count == 1
+
+            data = first.to_dict()
+            data["switches_total"] = 12345
+            with open(account_manager.state_file, "w") as f:
+                yaml.dump(data, f)
+
+            assert account_manager.get_state().switches_total == 12345
+            assert mock_load.call_count == 2
+
+    def test_get_state_detects_replace_with_same_mtime_and_size(self, account_manager):
+        """Test that a foreign write keeping mtime and size is still picked up."""
+        account_manager.switch_to(2)
+        st = os.stat(account_manager.state_file)
+
+        # Another process writes a same-sized state through a new file
+        data = account_manager.get_state().to_dict()
+        data["current_index"] = 3
+        other = account_manager.state_file.with_name("state.other")
+        other.write_text(json.dumps(data, indent=2))
+        assert other.stat().st_size == st.st_size
+        os.utime(other, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(other, account_manager.state_file)
+
+        assert account_manager.get_state().current_index == 3
+
+    def test_get_state_logs_unparsable_file(self, account_manager):
+        """Test that a state file that is neither JSON nor YAML yields defaults."""
+        account_manager.state_file.write_text("current_index: [unclosed\n")
+
+        state = account_manager.get_state()
+
+        assert state.current_index == 1
+        assert state.switches_total == 0
+
+    def test_get_state_after_write_skips_parse(self, account_manager):
+        """Test that the manager's own writes refresh the cache directly."""
+        account_manager.switch_to(3)
+
+        with patch("yaml.load") as mock_load:
+            assert account_manager.get_state().current_index == 3
+
+        mock_load.assert_not_called()
+
     def test_switch_to_specific_account(self, account_manager):
         """Test switching to a specific account by index."""
         result = account_manager.switch_to(3, reason=SwitchReason.MANUAL)
 
-        assert result is True
+        assert result == (True, 1)
 
         # Verify symlink was updated
         new_state = account_manager.get_state()
@@ -176,6 +226,7 @@ class TestAccountManager:
         assert "account2" in state.accounts
         assert state.accounts["account2"].switches_count == 1
         assert state.accounts["account2"].last_used is not None
+        assert state.accounts["account2"].last_used == state.last_switch
 
     def test_list_accounts_returns_correct_info(self, account_manager):
         """Test that list_accounts returns correct account information."""
@@ -187,6 +238,23 @@ class TestAccountManager:
         assert accounts["account1"]["exists"] is True
         assert accounts["account1"]["index"] == 1
 
+    def test_list_accounts_reports_missing_credentials(self, account_manager):
+        """Test that accounts without a credential file are marked missing."""
+        (account_manager.accounts_dir / "oauth_creds_4.json").unlink()
+
+        accounts = account_manager.list_accounts()
+
+        assert accounts["account4"]["exists"] is False
+        assert accounts["account5"]["exists"] is True
+
+    def test_list_accounts_without_accounts_dir(self, account_manager):
+        """Test that a missing accounts directory marks every account missing."""
+        account_manager.accounts_dir = account_manager.qwen_dir / "nowhere"
+
+        accounts = account_manager.list_accounts()
+
+        assert not any(info["exists"] for info in accounts.values())
+
     def test_get_stats_returns_correct_summary(self, account_manager):
         """Test that get_stats returns correct usage statistics."""
         # Switch a few times to generate stats
@@ -199,6 +267,16 @@ class TestAccountManager:
         assert stats["total_switches"] == 2
         assert stats["accounts"]["account3"] == 1
         assert stats["accounts"]["account4"] == 1
+        assert stats["most_used_account"] == "account3"
+        assert stats["most_used_count"] == 1
+
+    def test_get_stats_reads_state_once(self, account_manager):
+        """Test that get_stats does not go through list_accounts."""
+        with patch.object(account_manager, "get_state", wraps=account_manager.get_state) as mock_get:
+            stats = account_manager.get_stats()
+
+        assert mock_get.call_count == 1
+        assert stats["accounts"] == {f"account{i}": 0 for i in range(1, 6)}
 
     def test_atomic_symlink_update(self, account_manager):
         """Test that symlink update is atomic."""
@@ -210,6 +288,17 @@ class TestAccountManager:
         link_target = account_manager.creds_link.resolve()
         assert link_target == target
 
+    def test_atomic_symlink_update_replaces_stale_temp_link(self, account_manager):
+        """Test that a dangling temp link from an interrupted switch is replaced."""
+        temp_link = account_manager.creds_link.with_suffix(".json.tmp")
+        temp_link.symlink_to(account_manager.qwen_dir / "missing.json")
+        target = account_manager.accounts_dir / "oauth_creds_2.json"
+
+        account_manager._atomic_symlink_update(target)
+
+        assert account_manager.creds_link.resolve() == target
+        assert not os.path.lexists(temp_link)
+
     def test_write_state_is_atomic(self, account_manager):
         """Test that state writing is atomic (uses temp file)."""
         state = account_manager.get_state()
@@ -225,6 +314,29 @@ class TestAccountManager:
         assert data["current_index"] == 2
         assert data["switches_total"] == 42
 
+    def test_write_state_leaves_no_temp_files(self, account_manager):
+        """Test that the staging file is renamed into place, not left behind."""
+        account_manager.switch_to(2)
+        account_manager.switch_to(3)
+
+        assert not list(account_manager.qwen_dir.glob("*.tmp"))
+        assert not list(account_manager.qwen_dir.glob(".state.*"))
+
+    def test_state_written_as_json(self, account_manager):
+        """Test that state is stored as JSON that YAML readers still accept."""
+        account_manager.switch_to(2)
+
+        text = account_manager.state_file.read_text()
+        assert json.loads(text)["current_index"] == 2
+        assert yaml.safe_load(text) == json.loads(text)
+
+        # A fresh manager reads it back without falling back to YAML
+        with patch("yaml.load") as mock_load:
+            state = AccountManager(qwen_dir=account_manager.qwen_dir).get_state()
+
+        assert state.current_index == 2
+        mock_load.assert_not_called()
+
     def test_lock_prevents_concurrent_access(self, account_manager):
         """Test that file locking prevents concurrent modifications."""
         results = []
@@ -256,6 +368,23 @@ class TestAccountManager:
         final_state = account_manager.get_state()
         assert 1 <= final_state.current_index <= 5
 
+    def test_lock_file_opened_once_and_reopened_if_deleted(self, account_manager):
+        """Test that the lock descriptor is reused until the lock file goes away."""
+        from qwen_credential.account_manager import _LOCK_FDS
+
+        account_manager.switch_to(2)
+        fd = _LOCK_FDS[account_manager.lock_file]
+        account_manager.switch_to(3)
+        assert _LOCK_FDS[account_manager.lock_file] == fd
+
+        account_manager.lock_file.unlink()
+        account_manager.switch_to(4)
+
+        assert account_manager.lock_file.exists()
+        assert os.fstat(_LOCK_FDS[account_manager.lock_file]).st_ino == os.stat(
+            account_manager.lock_file
+        ).st_ino
+
     def test_rotation_log_is_written(self, account_manager):
         """Test that rotation events are logged correctly."""
         account_manager.switch_to(3, reason=SwitchReason.MANUAL)
@@ -268,6 +397,27 @@ class TestAccountManager:
         assert logs[0]["from"] == 1
         assert logs[0]["to"] == 3
         assert logs[0]["reason"] == "manual"
+        assert logs[0]["trigger"] == "manual"
+
+    def test_rotation_log_marks_auto_switches(self, account_manager):
+        """Test that quota-triggered switches are logged as automatic."""
+        account_manager.switch_next()
+
+        entry = json.loads(account_manager.log_file.read_text())
+        assert entry["reason"] == "auto_quota"
+        assert entry["trigger"] == "auto"
+
+    def test_rotation_log_survives_deletion(self, account_manager):
+        """Test that the kept-open rotation log is recreated if removed."""
+        account_manager.switch_to(2)
+        account_manager.log_file.unlink()
+
+        account_manager.switch_to(4)
+        AccountManager(qwen_dir=account_manager.qwen_dir)._log_switch(4, 5, SwitchReason.TEST)
+
+        entries = [json.loads(line) for line in account_manager.log_file.read_text().splitlines()]
+        assert [entry["to"] for entry in entries] == [4, 5]
+        assert entries[1]["reason"] == "test"
 
     def test_validate_account_exists_raises_error_when_missing(self, account_manager):
         """Test that _validate_account_exists raises error for missing accounts."""
@@ -298,7 +448,7 @@ class TestQwenWrapper:
     @pytest.fixture
     def wrapper(self, mock_account_manager):
         """Create a QwenWrapper with mock AccountManager."""
-        return QwenWrapper(account_manager=mock_account_manager, max_retries=3)
+        return QwenWrapper(account_manager=mock_account_manager, max_retries=3, backoff_base=0)
 
     def test_quota_pattern_detection(self, wrapper):
         """Test that quota error patterns are correctly detected."""
@@ -318,6 +468,24 @@ class TestQwenWrapper:
 
             assert wrapper._is_quota_error(result), f"Failed to detect: {error_msg}"
 
+    def test_quota_pattern_detected_in_stdout(self, wrapper):
+        """Test that quota messages printed to stdout are detected, in any case."""
+        result = Mock(returncode=1, stderr=None, stdout="Error: QUOTA EXCEEDED for today")
+
+        assert wrapper._is_quota_error(result)
+
+    def test_quota_scan_limited_to_output_tail(self, wrapper):
+        """Test that only the tail of long output is scanned for quota patterns."""
+        from qwen_credential.qwen_wrapper import QUOTA_SCAN_WINDOW
+
+        head = "Discussing HTTP 429 responses.\n"
+        padding = "x" * QUOTA_SCAN_WINDOW
+        result = Mock(returncode=0, stderr="", stdout=head + padding)
+        assert not wrapper._is_quota_error(result)
+
+        result = Mock(returncode=1, stderr=padding + "\nError: rate limit exceeded", stdout="")
+        assert wrapper._is_quota_error(result)
+
     def test_non_quota_errors_not_detected(self, wrapper):
         """Test that non-quota errors are not flagged as quota errors."""
         non_quota_errors = [
@@ -367,7 +535,9 @@ class TestQwenWrapper:
             assert result.success is True
             assert result.output == "AI response"
             assert result.attempts == 2
+            assert result.accounts_tried == [1, 2]
             mock_account_manager.switch_next.assert_called_once()
+            mock_account_manager.get_state.assert_called_once()
 
     def test_all_accounts_exhausted_returns_failure(self, wrapper, mock_account_manager):
         """Test that exhausting all accounts returns failure."""
@@ -436,6 +606,83 @@ class TestQwenWrapper:
             assert result.success is False
             assert "timed out" in result.error
 
+    def test_quota_retry_backs_off_exponentially(self, mock_account_manager):
+        """Test that quota-triggered retries sleep base * 2**attempt without jitter."""
+        wrapper = QwenWrapper(
+            account_manager=mock_account_manager,
+            max_retries=4,
+            backoff_base=0.5,
+            backoff_cap=1.5,
+            jitter=False,
+        )
+        mock_account_manager.switch_next.side_effect = [(True, 2), (True, 3), (True, 1), (True, 2)]
+
+        with patch("qwen_credential.qwen_wrapper.subprocess.run") as mock_run, \
+                patch("qwen_credential.qwen_wrapper.time.sleep") as mock_sleep:
+            mock_run.return_value = Mock(returncode=1, stderr="quota exhausted", stdout="")
+            result = wrapper.call("test prompt")
+
+        assert result.success is False
+        # No sleep after the final attempt; third delay is capped
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [0.5, 1.0, 1.5]
+
+    def test_quota_retry_prefers_retry_after_hint(self, mock_account_manager):
+        """Test that a Retry-After hint in stderr overrides the backoff formula."""
+        wrapper = QwenWrapper(account_manager=mock_account_manager, max_retries=2)
+        mock_account_manager.switch_next.return_value = (True, 2)
+
+        with patch("qwen_credential.qwen_wrapper.subprocess.run") as mock_run, \
+                patch("qwen_credential.qwen_wrapper.time.sleep") as mock_sleep:
+            mock_run.side_effect = [
+                Mock(returncode=1, stderr="429 Too Many Requests. Retry-After: 2", stdout=""),
+                Mock(returncode=0, stdout="AI response", stderr=""),
+            ]
+            result = wrapper.call("test prompt")
+
+        assert result.success is True
+        mock_sleep.assert_called_once_with(2.0)
+
+    def test_check_quota_status_reuses_fresh_results(self, wrapper, mock_account_manager):
+        """Test that quota status is cached for quota_ttl seconds."""
+        with patch("qwen_credential.qwen_wrapper.subprocess.run") as mock_run:
+            mock_run.return_value = Mock(returncode=0, stdout="ok", stderr="")
+
+            first = wrapper.check_quota_status()
+            second = wrapper.check_quota_status()
+
+        assert first == second == {"account1": True, "account2": True, "account3": True}
+        assert mock_run.call_count == 3
+        # Second check neither probed nor switched accounts
+        assert mock_account_manager.switch_to.call_count == 4
+
+    def test_check_quota_status_uses_call_observations(self, wrapper, mock_account_manager):
+        """Test that quota errors seen by call() skip the probe for that account."""
+        with patch("qwen_credential.qwen_wrapper.subprocess.run") as mock_run:
+            mock_run.side_effect = [
+                Mock(returncode=1, stderr="quota exhausted", stdout=""),
+                Mock(returncode=0, stdout="AI response", stderr=""),
+            ]
+            mock_account_manager.switch_next.return_value = (True, 2)
+            wrapper.call("test prompt")
+
+            mock_run.side_effect = None
+            mock_run.return_value = Mock(returncode=0, stdout="ok", stderr="")
+            status = wrapper.check_quota_status()
+
+        assert status == {"account1": False, "account2": True, "account3": True}
+        assert mock_run.call_count == 3
+
+    def test_check_quota_status_expires_after_ttl(self, mock_account_manager):
+        """Test that stale quota results are probed again."""
+        wrapper = QwenWrapper(account_manager=mock_account_manager, quota_ttl=0)
+
+        with patch("qwen_credential.qwen_wrapper.subprocess.run") as mock_run:
+            mock_run.return_value = Mock(returncode=0, stdout="ok", stderr="")
+            wrapper.check_quota_status()
+            wrapper.check_quota_status()
+
+        assert mock_run.call_count == 6
+
 
 # =============================================================================
 # create_initial_state Tests
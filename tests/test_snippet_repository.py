@@ -0,0 +1,222 @@
+import pytest
+from unittest.mock import MagicMock, Mock, patch
+from repositories.snippet_repository import VectorStore
+
+
+class FakeCollection:
+    """In-memory stand-in for a Chroma collection (get/add/delete/count)."""
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = {}
+        self.get_calls = []
+
+    def _matches(self, meta, where):
+        if not where:
+            return True
+        if "$and" in where:
+            return all(self._matches(meta, clause) for clause in where["$and"])
+        return all(meta.get(key) == value for key, value in where.items())
+
+    def add(self, documents, metadatas, ids, embeddings=None):
+        embeddings = embeddings or [None] * len(ids)
+        for row in zip(ids, documents, metadatas, embeddings):
+            self.rows[row[0]] = row[1:]
+
+    def delete(self, ids=None, where=None):
+        for row_id in [i for i, (_, meta, _) in self.rows.items() if self._matches(meta, where)]:
+            if ids is None or row_id in ids:
+                del self.rows[row_id]
+
+    def count(self):
+        return len(self.rows)
+
+    def get(self, ids=None, where=None, include=("metadatas", "documents"), limit=None, offset=None):
+        self.get_calls.append({"where": where, "include": list(include), "limit": limit, "offset": offset})
+        selected = [
+            (row_id, *row) for row_id, row in self.rows.items()
+            if self._matches(row[1], where) and (ids is None or row_id in ids)
+        ]
+        start = offset or 0
+        selected = selected[start:start + limit if limit is not None else None]
+        return {
+            "ids": [row[0] for row in selected],
+            "documents": [row[1] for row in selected] if "documents" in include else None,
+            "metadatas": [row[2] for row in selected] if "metadatas" in include else None,
+            "embeddings": [row[3] for row in selected] if "embeddings" in include else None,
+        }
+
+
+def _meta(file_path, source="vault", content_hash="h", **extra):
+    return {"file_path": file_path, "source": source, "content_hash": content_hash, **extra}
+
+
+def _make_store(client):
+    client.get_or_create_collection.side_effect = FakeCollection
+    client.create_collection.side_effect = FakeCollection
+    with patch("repositories.snippet_repository.chromadb.PersistentClient", return_value=client):
+        return VectorStore(persist_directory="unused")
+
+
+@pytest.fixture
+def vector_store():
+    client = MagicMock()
+    client.get_max_batch_size.return_value = 5461
+    store = _make_store(client)
+    store.add_chunks(
+        chunks=["gold a", "gold b", "bonds", "readme"],
+        metadatas=[
+            _meta("notes/gold.md", content_hash="g", tags="macro,gold", outbound_links="Bonds|bond note,Silver#Price"),
+            _meta("notes/gold.md", content_hash="g", tags="macro,gold", outbound_links="Bonds|bond note,Silver#Price"),
+            _meta("notes/bonds.md", content_hash="b", tags=" macro , ", outbound_links=""),
+            _meta("README.md", source="repo", content_hash="r"),
+        ],
+        ids=["vault::gold::0", "vault::gold::1", "vault::bonds::0", "repo::README::0"],
+        embeddings=[[0.1, 0.2], [0.2, 0.1], [0.3, 0.3], [0.4, 0.1]],
+    )
+    return store
+
+
+class TestVectorStore:
+
+    def test_file_paths_by_source(self, vector_store):
+        assert sorted(vector_store.get_all_file_paths()) == ["README.md", "notes/bonds.md", "notes/gold.md"]
+        assert sorted(vector_store.get_all_file_paths("vault")) == ["notes/bonds.md", "notes/gold.md"]
+        assert vector_store.get_all_file_paths("missing") == []
+
+    def test_stats_scan_metadata_once(self, vector_store):
+        stats = vector_store.get_stats()
+        vector_store.get_stats()
+        vector_store.get_all_file_paths("repo")
+
+        assert stats["total_chunks"] == 4
+        assert stats["total_files"] == 3
+        assert len(vector_store.collection.get_calls) == 1
+        assert vector_store.collection.get_calls[0]["include"] == ["metadatas"]
+
+    def test_file_paths_follow_writes(self, vector_store):
+        vector_store.get_all_file_paths()
+
+        vector_store.delete_by_file_path("notes/gold.md", "vault")
+        vector_store.add_chunks(
+            chunks=["silver"], metadatas=[_meta("notes/silver.md")], ids=["vault::silver::0"],
+            embeddings=[[0.5, 0.5]],
+        )
+        assert sorted(vector_store.get_all_file_paths()) == ["README.md", "notes/bonds.md", "notes/silver.md"]
+
+        vector_store.reset()
+        assert vector_store.get_all_file_paths() == []
+        assert vector_store.get_stats()["total_files"] == 0
+
+    def test_metadata_pages(self, vector_store):
+        pages = list(vector_store._iter_metadatas(page_size=3))
+
+        assert [len(page) for page in pages] == [3, 1]
+        assert [call["offset"] for call in vector_store.collection.get_calls] == [0, 3]
+
+    def test_vault_statistics(self, vector_store):
+        stats = vector_store.get_vault_statistics()
+
+        assert stats["total_files"] == 3
+        assert stats["total_chunks"] == 4
+        assert stats["total_tags"] == 5
+        assert stats["unique_tags"] == 2
+        assert stats["total_links"] == 4
+        assert stats["unique_links"] == 2
+        assert stats["most_used_tags"][0] == {"tag": "macro", "count": 3}
+        assert {"note": "Bonds", "count": 2} in stats["most_linked_notes"]
+
+    def test_content_hash_lookups_share_one_scan(self, vector_store):
+        assert vector_store.check_content_hash("notes/gold.md", "vault") == "g"
+        assert vector_store.check_content_hash("README.md", "repo") == "r"
+        assert vector_store.check_content_hash("README.md", "vault") is None
+        assert vector_store.check_content_hash("notes/missing.md", "vault") is None
+        assert len(vector_store.collection.get_calls) == 1
+
+    def test_content_hash_follows_writes(self, vector_store):
+        vector_store.check_content_hash("notes/gold.md", "vault")
+
+        vector_store.delete_by_file_path("notes/gold.md", "vault")
+        assert vector_store.check_content_hash("notes/gold.md", "vault") is None
+
+        vector_store.add_chunks(
+            chunks=["gold v2"], metadatas=[_meta("notes/gold.md", content_hash="g2")], ids=["vault::gold::0"],
+            embeddings=[[0.1, 0.2]],
+        )
+        assert vector_store.check_content_hash("notes/gold.md", "vault") == "g2"
+        assert len(vector_store.collection.get_calls) == 1
+
+    def test_add_chunks_in_sub_batches(self, vector_store):
+        with patch.object(vector_store.collection, "add", wraps=vector_store.collection.add) as mock_add:
+            vector_store.add_chunks(
+                chunks=[f"chunk {i}" for i in range(5)],
+                metadatas=[_meta("notes/long.md") for _ in range(5)],
+                ids=[f"vault::long::{i}" for i in range(5)],
+                embeddings=[[float(i), 0.0] for i in range(5)],
+                batch_size=2,
+            )
+
+        assert [len(call.kwargs["ids"]) for call in mock_add.call_args_list] == [2, 2, 1]
+        assert [len(call.kwargs["embeddings"]) for call in mock_add.call_args_list] == [2, 2, 1]
+        assert vector_store.collection.count() == 9
+
+    @pytest.mark.parametrize(
+        "client, expected_sizes",
+        [
+            # chromadb 0.4.x exposes the limit as an attribute
+            (Mock(spec=["get_or_create_collection", "create_collection", "max_batch_size"], max_batch_size=2), [2, 2, 1]),
+            # No limit exposed at all: batch_size alone decides
+            (Mock(spec=["get_or_create_collection", "create_collection"]), [3, 2]),
+        ],
+    )
+    def test_add_chunks_batch_limit_fallbacks(self, client, expected_sizes):
+        store = _make_store(client)
+
+        with patch.object(store.collection, "add", wraps=store.collection.add) as mock_add:
+            store.add_chunks(
+                chunks=[f"chunk {i}" for i in range(5)],
+                metadatas=[_meta("notes/long.md") for _ in range(5)],
+                ids=[f"vault::long::{i}" for i in range(5)],
+                batch_size=3,
+            )
+
+        assert [len(call.kwargs["ids"]) for call in mock_add.call_args_list] == expected_sizes
+
+    def test_add_chunks_rejects_empty_batches(self, vector_store):
+        with pytest.raises(ValueError, match="batch_size must be at least 1"):
+            vector_store.add_chunks(chunks=["x"], metadatas=[_meta("x.md")], ids=["x"], batch_size=0)
+
+    def test_failed_sub_batch_rolls_back_earlier_slices(self, vector_store):
+        vector_store.check_content_hash("notes/gold.md", "vault")
+        real_add = vector_store.collection.add
+        calls = []
+
+        def flaky_add(**kwargs):
+            calls.append(kwargs["ids"])
+            if len(calls) == 2:
+                raise RuntimeError("disk full")
+            real_add(**kwargs)
+
+        with patch.object(vector_store.collection, "add", side_effect=flaky_add):
+            with pytest.raises(RuntimeError, match="disk full"):
+                vector_store.add_chunks(
+                    chunks=[f"chunk {i}" for i in range(5)],
+                    metadatas=[_meta("notes/long.md", content_hash="new") for _ in range(5)],
+                    ids=[f"vault::long::{i}" for i in range(5)],
+                    batch_size=2,
+                )
+
+        assert vector_store.collection.get(where={"file_path": "notes/long.md"})["ids"] == []
+        assert vector_store.collection.count() == 4
+        # The next lookup rescans instead of trusting the interrupted update
+        assert vector_store.check_content_hash("notes/long.md", "vault") is None
+        assert len(vector_store.collection.get_calls) == 3
+
+    def test_get_by_file_path_include(self, vector_store):
+        full = vector_store.get_by_file_path("notes/gold.md")
+        embeddings_only = vector_store.get_by_file_path("notes/gold.md", ["embeddings"])
+
+        assert full["documents"] == ["gold a", "gold b"]
+        assert embeddings_only["embeddings"] == [[0.1, 0.2], [0.2, 0.1]]
+        assert embeddings_only["documents"] is None
+        assert embeddings_only["metadatas"] is None
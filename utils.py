@@ -5,8 +5,12 @@ Helper functions for hashing, token counting, path manipulation,
 and metadata extraction from markdown files.
 """
 
+import functools
 import hashlib
+import os
 import re
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
 import tiktoken
@@ -26,6 +30,64 @@ def compute_content_hash(content: str) -> str:
     return hashlib.md5(content.encode("utf-8")).hexdigest()
 
 
+# Tag separators in a string-valued frontmatter "tags" field
+_TAG_SPLIT_RE = re.compile(r"[,\s]+")
+# Fenced code blocks, inline code spans and header lines, stripped before tag search
+_CODE_BLOCK_RE = re.compile(r"```.*?```", re.DOTALL)
+_INLINE_CODE_RE = re.compile(r"`[^`]+`")
+_HEADER_LINE_RE = re.compile(r"^\s*#+\s+.*$", re.MULTILINE)
+# Hashtag not preceded by a word character or a URL scheme separator
+_INLINE_TAG_RE = re.compile(r"(?<!://.)(?<!\w)#([a-zA-Z0-9_-]+)(?!\w)")
+# [[Note Name]] with optional #Header and/or |Alias suffix
+_WIKILINK_RE = re.compile(r"\[\[([^\]|#]+)(?:[|#][^\]]+)?\]\]")
+
+# Token counts shared by every caller in the process, so templates and
+# boilerplate repeated across notes are tokenized once per crawl. Keyed by
+# (model, digest of the text) rather than the text itself, so entries stay
+# small in the long-running server; least recently used entries are evicted.
+TOKEN_COUNT_CACHE_SIZE = 100_000
+_TOKEN_COUNT_CACHE: OrderedDict[tuple[str, bytes], int] = OrderedDict()
+_TOKEN_COUNT_LOCK = threading.Lock()
+
+# tiktoken starts a fresh thread pool per encode_batch call; below this many
+# texts (or on a single core) encoding them in turn is faster
+BATCH_THREAD_MIN = 16
+_BATCH_THREADS = min(8, os.cpu_count() or 1)
+
+
+@functools.lru_cache(maxsize=8)
+def _get_encoding(model: str) -> tiktoken.Encoding:
+    """Return the tiktoken encoding for a model, falling back to cl100k_base."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        # Fallback to cl100k_base (used by most recent models)
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def _token_cache_key(model: str, text: str) -> tuple[str, bytes]:
+    """Key a text's token count by model and a 128-bit digest of the text."""
+    return model, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _cached_token_counts(keys: list[tuple[str, bytes]]) -> list[int | None]:
+    """Look up token counts, marking hits as recently used."""
+    with _TOKEN_COUNT_LOCK:
+        counts = [_TOKEN_COUNT_CACHE.get(key) for key in keys]
+        for key, tokens in zip(keys, counts):
+            if tokens is not None:
+                _TOKEN_COUNT_CACHE.move_to_end(key)
+    return counts
+
+
+def _store_token_counts(counts: dict[tuple[str, bytes], int]) -> None:
+    """Add fresh counts to the token cache, evicting least recently used entries."""
+    with _TOKEN_COUNT_LOCK:
+        _TOKEN_COUNT_CACHE.update(counts)
+        while len(_TOKEN_COUNT_CACHE) > TOKEN_COUNT_CACHE_SIZE:
+            _TOKEN_COUNT_CACHE.popitem(last=False)
+
+
 def count_tokens(text: str, model: str = "text-embedding-3-small") -> int:
     """
     Count tokens in text using tiktoken (OpenAI's tokenizer).
@@ -40,15 +102,98 @@ def count_tokens(text: str, model: str = "text-embedding-3-small") -> int:
     Raises:
         ValueError: If model not supported
     """
-    try:
-        # Get encoding for the model
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        # Fallback to cl100k_base (used by most recent models)
-        encoding = tiktoken.get_encoding("cl100k_base")
+    key = _token_cache_key(model, text)
+    tokens = _cached_token_counts([key])[0]
+    if tokens is None:
+        tokens = len(_get_encoding(model).encode(text))
+        _store_token_counts({key: tokens})
+    return tokens
 
-    tokens = encoding.encode(text)
-    return len(tokens)
+
+def count_tokens_batch(texts: list[str], model: str = "text-embedding-3-small") -> list[int]:
+    """
+    Count tokens for several texts with a single tiktoken call.
+
+    Texts already in the token cache are not encoded again. Large batches
+    of the rest are encoded on tiktoken's worker threads, which release
+    the GIL; small ones are encoded in the calling thread.
+
+    Args:
+        texts: Texts to count tokens for
+        model: OpenAI model name for tokenizer
+
+    Returns:
+        Number of tokens for each text, in input order
+    """
+    keys = {text: _token_cache_key(model, text) for text in dict.fromkeys(texts)}
+    counts = {}
+    misses = []
+    for text, tokens in zip(keys, _cached_token_counts(list(keys.values()))):
+        if tokens is None:
+            misses.append(text)
+        else:
+            counts[text] = tokens
+
+    if misses:
+        encoding = _get_encoding(model)
+        if len(misses) < BATCH_THREAD_MIN or _BATCH_THREADS < 2:
+            encoded = [encoding.encode(text) for text in misses]
+        else:
+            encoded = encoding.encode_batch(misses, num_threads=_BATCH_THREADS)
+        fresh = {text: len(tokens) for text, tokens in zip(misses, encoded)}
+        _store_token_counts({keys[text]: tokens for text, tokens in fresh.items()})
+        counts.update(fresh)
+
+    return [counts[text] for text in texts]
+
+
+def encode_text(text: str, model: str = "text-embedding-3-small") -> list[int]:
+    """
+    Encode text into token ids.
+
+    Args:
+        text: Text to encode
+        model: OpenAI model name for tokenizer
+
+    Returns:
+        List of token ids
+    """
+    return _get_encoding(model).encode(text)
+
+
+def decode_tokens(tokens: list[int], model: str = "text-embedding-3-small") -> str:
+    """
+    Decode token ids back into text.
+
+    Args:
+        tokens: Token ids to decode
+        model: OpenAI model name for tokenizer
+
+    Returns:
+        Decoded text
+
+    Raises:
+        UnicodeDecodeError: If the tokens start or end inside a multi-byte character
+    """
+    return _get_encoding(model).decode(tokens, errors="strict")
+
+
+@functools.lru_cache(maxsize=8)
+def max_token_length(model: str = "text-embedding-3-small") -> int:
+    """
+    Length in bytes of the longest token in the model's vocabulary.
+
+    Every token covers at most this many bytes (and so characters), which
+    gives a cheap lower bound on a text's token count: len(text) divided
+    by this value.
+
+    Args:
+        model: OpenAI model name for tokenizer
+
+    Returns:
+        Byte length of the longest token
+    """
+    return max(len(token) for token in _get_encoding(model).token_byte_values())
 
 
 def get_relative_path(file_path: Path, vault_path: Path) -> str:
@@ -121,7 +266,7 @@ def extract_frontmatter_tags(content: str) -> list[str]:
         elif isinstance(tags_field, str):
             # tags: tag1, tag2  or  tags: #tag1 #tag2
             # Split on commas and/or spaces
-            tag_parts = re.split(r"[,\s]+", tags_field)
+            tag_parts = _TAG_SPLIT_RE.split(tags_field)
             for tag in tag_parts:
                 tag_str = tag.strip().lstrip("#")
                 if tag_str:
@@ -150,20 +295,18 @@ def extract_inline_tags(content: str) -> list[str]:
     tags = []
 
     # Remove code blocks (```) to avoid matching tags in code
-    content_no_code = re.sub(r"```.*?```", "", content, flags=re.DOTALL)
+    content_no_code = _CODE_BLOCK_RE.sub("", content)
 
     # Remove inline code (`) to avoid matching tags in code
-    content_no_code = re.sub(r"`[^`]+`", "", content_no_code)
+    content_no_code = _INLINE_CODE_RE.sub("", content_no_code)
 
     # Remove markdown headers (# at start of line) to avoid false positives
-    content_no_code = re.sub(r"^\s*#+\s+.*$", "", content_no_code, flags=re.MULTILINE)
+    content_no_code = _HEADER_LINE_RE.sub("", content_no_code)
 
     # Find hashtags: word boundary, #, then alphanumeric/underscore/hyphen
     # Negative lookbehind for URLs (no :// before)
     # Negative lookahead for more # (avoid matching ##, ###, etc.)
-    pattern = r"(?<!://.)(?<!\w)#([a-zA-Z0-9_-]+)(?!\w)"
-
-    matches = re.findall(pattern, content_no_code)
+    matches = _INLINE_TAG_RE.findall(content_no_code)
 
     # Deduplicate while preserving order
     seen = set()
@@ -265,9 +408,7 @@ def extract_wikilinks(content: str) -> list[str]:
     """
     # Pattern: [[ (note_name) (separator (alias/header)) ]]
     # [^\]|#]* matches the note name until | or # or ]
-    pattern = r"\[\[([^\]|#]+)(?:[|#][^\]]+)?\]\]"
-    
-    matches = re.findall(pattern, content)
+    matches = _WIKILINK_RE.findall(content)
     
     # Deduplicate while preserving order
     seen = set()